@@ -0,0 +1,184 @@
+# 럭키덕키 선생님용 통계
+# 상위 5명 말고 전체 분포: 단별 기록 히스토그램 / 백분위수, 날짜별 도전 수와 중앙값 추이
+#
+# 랭킹 저장소(이름, 단, 기록(초), 날짜 = 단별 개인 최고 기록)와 도전 기록 로그(rank/attempts.csv, 같은 형식)를
+# 한 번에 NumPy 열 배열로 읽고, 단/날짜별 값은 정렬 + bincount 로 한 번에 계산 (행마다 도는 파이썬 루프 없음)
+#
+# 계산은 별도 프로세스(ProcessPoolExecutor)에서 돌고, 결과는 저장소 버전이 바뀔 때까지 재사용
+# 버전이 바뀐 뒤 첫 요청은 이전 결과를 그대로 돌려주고 뒤에서 다시 계산 -> 화면 스레드는 기다리지 않음
+import os
+import threading
+
+import rank_store
+
+PERCENTILES = [10, 25, 50, 75, 90]
+HIST_STEP = 5.0    # 히스토그램 칸 너비(초)
+HIST_MAX = 60.0    # 이보다 느린 기록은 마지막 칸("60초 이상")에 모음
+
+
+def dan_number(label):
+    # "7단" -> 7. 알아볼 수 없는 단 이름(손으로 고친 줄 등)은 0
+    try:
+        number = int(label.rstrip("단"))
+    except ValueError:
+        return 0
+    return number if 0 < number < 2 ** 15 else 0
+
+
+def parse_day(date_str):
+    import numpy as np
+    try:
+        return np.datetime64(date_str, "D")
+    except ValueError:
+        return np.datetime64("NaT")
+
+
+def columns(rows):
+    # (이름, 단, 기록, 날짜) 튜플 목록 -> 단 번호 / 기록 / 날짜(datetime64[D]) 배열
+    # 단 / 날짜 / 기록을 읽을 수 없는 줄은 빼고 셈
+    import numpy as np
+    if not rows:
+        return np.zeros(0, dtype=np.int16), np.zeros(0), np.zeros(0, dtype="datetime64[D]")
+    _, labels, times, dates = zip(*rows)
+    dans = np.array([dan_number(label) for label in labels], dtype=np.int16)
+    try:
+        days = np.array(dates, dtype="datetime64[D]")
+    except ValueError:
+        days = np.array([parse_day(d) for d in dates], dtype="datetime64[D]")  # 이상한 날짜가 섞인 경우만 한 줄씩
+    times = np.array(times, dtype=np.float64)
+    keep = (dans > 0) & ~np.isnat(days) & np.isfinite(times)
+    return dans[keep], times[keep], days[keep]
+
+
+def group_percentiles(keys, values, percentiles):
+    # 키별 백분위수를 한 번의 정렬로: (키, 값) 순으로 정렬한 뒤 그룹마다 위치만 계산 (선형 보간)
+    import numpy as np
+    order = np.lexsort((values, keys))
+    keys, values = keys[order], values[order]
+    unique, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    q = np.asarray(percentiles, dtype=np.float64) / 100
+    pos = starts[:, None] + q[None, :] * (counts[:, None] - 1)
+    low = np.floor(pos).astype(np.int64)
+    high = np.minimum(low + 1, (starts + counts - 1)[:, None])
+    frac = pos - low
+    return unique, counts, values[low] * (1 - frac) + values[high] * frac
+
+
+def dan_distributions(dans, times):
+    import numpy as np
+    if not len(dans):
+        return {}
+    unique, counts, pct = group_percentiles(dans, times, PERCENTILES)
+    n_bins = int(HIST_MAX / HIST_STEP) + 1
+    bins = np.minimum((times // HIST_STEP).astype(np.int64), n_bins - 1)
+    dan_idx = np.searchsorted(unique, dans)
+    hist = np.bincount(dan_idx * n_bins + bins, minlength=len(unique) * n_bins).reshape(len(unique), n_bins)
+    sums = np.bincount(dan_idx, weights=times, minlength=len(unique))
+    return {
+        f"{dan}단": {
+            "count": int(count),
+            "mean": float(total / count),
+            "percentiles": dict(zip(PERCENTILES, map(float, row))),
+            "hist": [int(h) for h in hist_row],
+        }
+        for dan, count, total, row, hist_row in zip(unique, counts, sums, pct, hist)
+    }
+
+
+def daily_trend(days, times):
+    # 날짜별 (도전 수, 기록 중앙값)
+    import numpy as np
+    if not len(days):
+        return []
+    unique, counts, pct = group_percentiles(days.astype(np.int64), times, [50])
+    return [(str(np.datetime64(int(day), "D")), int(count), float(median[0]))
+            for day, count, median in zip(unique, counts, pct)]
+
+
+def hist_labels():
+    n_bins = int(HIST_MAX / HIST_STEP) + 1
+    labels = [f"{i * HIST_STEP:.0f}~{(i + 1) * HIST_STEP:.0f}초" for i in range(n_bins - 1)]
+    return labels + [f"{HIST_MAX:.0f}초 이상"]
+
+
+def compute(backend, rank_dir):
+    # 작업 프로세스에서 실행: 파일을 직접 읽어서 결과(작은 dict)만 돌려보냄
+    store = rank_store.open_store(backend, rank_dir)
+    dans, times, _ = columns(store.rows())
+    attempt_rows = rank_store.read_csv_rows(os.path.join(rank_dir, "attempts.csv"))
+    _, attempt_times, attempt_days = columns(attempt_rows)
+    return {
+        "players": len(times),
+        "attempts": len(attempt_times),
+        "dans": dan_distributions(dans, times),
+        "daily": daily_trend(attempt_days, attempt_times),
+    }
+
+
+class Analytics:
+    def __init__(self, store, backend, rank_dir, workers=1):
+        self.store = store
+        self.backend = backend
+        self.rank_dir = rank_dir
+        self.attempts_path = os.path.join(rank_dir, "attempts.csv")
+        self.workers = workers
+        self._pool = self._new_pool()
+        self._lock = threading.Lock()
+        self._result = None
+        self._result_version = None
+        self._future = None
+        self._future_version = None
+        self.last_error = None  # 마지막 계산이 실패했으면 그 예외 (성공하면 지움)
+        self._error_version = None
+
+    def _new_pool(self):
+        # 스레드가 여러 개 도는 서버 프로세스를 fork 하지 않도록 spawn 사용 (통계 화면을 처음 열 때 불러옴)
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _submit(self):
+        from concurrent.futures.process import BrokenProcessPool
+        try:
+            return self._pool.submit(compute, self.backend, self.rank_dir)
+        except BrokenProcessPool:
+            # 작업 프로세스가 죽었으면 (메모리 부족 등) 풀을 새로 만들어 한 번 더
+            self._pool = self._new_pool()
+            return self._pool.submit(compute, self.backend, self.rank_dir)
+
+    def version(self):
+        try:
+            info = os.stat(self.attempts_path)
+            attempts = (info.st_mtime_ns, info.st_size)
+        except OSError:
+            attempts = None
+        return self.store.version(), attempts
+
+    def snapshot(self):
+        # (결과, 새로 계산 중인지). 처음 계산이 끝나기 전에는 결과가 None
+        version = self.version()
+        with self._lock:
+            if self._future is not None and self._future.done():
+                try:
+                    self._result = self._future.result()
+                    self._result_version = self._future_version
+                    self.last_error = None
+                except Exception as e:
+                    # 같은 버전으로는 다시 계산해도 같으므로 기록이 바뀔 때까지 기다림
+                    self.last_error = repr(e)
+                    self._error_version = self._future_version
+                self._future = None
+            if version not in (self._result_version, self._error_version) and self._future is None:
+                self._future = self._submit()
+                self._future_version = version
+            return self._result, self._future is not None
+
+    def wait(self, timeout=None):
+        with self._lock:
+            future = self._future
+        if future is not None:
+            future.exception(timeout)
+        return self.snapshot()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
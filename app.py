@@ -1,29 +1,136 @@
-import streamlit as st
-import streamlit.components.v1 as components
-import random
-import time
 import base64
+import hashlib
 import os
-import csv
-import pandas as pd
-from datetime import datetime
+import random
+import struct
+import time
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import analytics
+import game_core
+import image_pipeline
+import leaderboard
+import metrics
+import ops
+import player_stats
+import problem_pool
+import rank_store
+import telemetry
+
+script_started = time.thread_time()  # [추가] 리런 CPU 시간 측정용
+rerun_started = time.perf_counter()
 
 # --- 1. 기본 설정 및 파일 로드 ---
 st.set_page_config(page_title="럭키덕키 스피드 구구단", page_icon="🐣", layout="centered")
 
 IMG_DIR = "images"
-RANK_DIR = "rank"
-RANK_FILE = os.path.join(RANK_DIR, "ranking_speed.csv")
-
-if not os.path.exists(RANK_DIR): os.makedirs(RANK_DIR)
-if not os.path.exists(RANK_FILE):
-    with open(RANK_FILE, mode='w', newline='', encoding='utf-8') as f:
-        csv.writer(f).writerow(["이름", "단", "기록(초)", "날짜"])
+COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "components")
+STATIC_DIR = "static"  # streamlit 정적 서빙 폴더 (.streamlit/config.toml 의 enableStaticServing)
+IMG_EXTS = [".png", ".jpg", ".jpeg"]
+# "static": /app/static 에서 해시 URL 로 서빙 (브라우저 캐시), "inline": base64 로 CSS 에 직접 삽입
+ASSET_MODE = os.environ.get("ASSET_MODE", "static")
+# 1 이면 리런/두더지판 실행 CPU 시간을 화면 아래에 표시 (fragment 효과 비교용)
+SHOW_RERUN_TIMING = os.environ.get("SHOW_RERUN_TIMING") == "1"
+RANK_DIR = os.environ.get("RANK_DIR", "rank")
+# "csv": rank/ranking_speed.csv, "sqlite": rank/ranking.db (처음 열 때 CSV 기록을 가져옴)
+# "kv": 랭킹 서버(python rank_kv.py serve) 하나를 앱 서버 여러 대가 같이 씀. 주소는 RANK_KV_ADDR (기본 127.0.0.1:7411)
+# "segments": rank/segments/ 날짜별 세그먼트 + 요약 (RANK_PARTITION=day/week, RANK_RETENTION_DAYS 지난 원본은 지움)
+RANK_BACKEND = os.environ.get("RANK_BACKEND", "csv")
+# 기록 저장 묶음(group commit): 최대 개수 / 최대 대기(ms) / fsync 정책 ("always", "batch", "none")
+RANK_BATCH_SIZE = int(os.environ.get("RANK_BATCH_SIZE", "64"))
+RANK_BATCH_MS = int(os.environ.get("RANK_BATCH_MS", "50"))
+RANK_FSYNC = os.environ.get("RANK_FSYNC", "batch")
+# 판별 클릭 기록(바이너리 세그먼트) 폴더. 읽기: python telemetry.py report
+TELEMETRY_DIR = os.environ.get("TELEMETRY_DIR", "telemetry")
+# 숨김 관리자 페이지: 주소 뒤에 ?admin=<ADMIN_TOKEN> 을 붙여야만 열림 (비어 있으면 꺼짐)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+# 구구단 범위: 고를 수 있는 단 / 나오는 곱하는 수 ("2-19", "1-9", "2,3,5,12-15" 처럼)
+DANS = game_core.parse_range(os.environ.get("DAN_RANGE", "2-9"))
+MULTIPLIERS = game_core.parse_range(os.environ.get("MULTIPLIER_RANGE", "1-9"))
+
+# [추가] 구간 시간 측정 (METRICS=1 일 때만). 페이지별로 모아서 /metrics 와 관리자 페이지에서 봄
+def timed(section):
+    return metrics.section(section, st.session_state.get('page', 'intro'))
+
+@st.cache_resource
+def start_metrics_server():
+    return metrics.start_server()
+
+if metrics.ENABLED:
+    start_metrics_server()
+
+# [추가] 운영 현황판: 카운터는 항상 모으고, 1초마다 링 버퍼에 샘플링 (관리자 페이지에서 봄)
+@st.cache_resource
+def get_ops_monitor():
+    return ops.Monitor(ops.COUNTERS, get_rank_writer().stats)
+
+# 화면에 보내는 HTML 은 모두 여기를 거침 (리런당 HTML 바이트 집계)
+def html(body):
+    ops.COUNTERS.add("html_bytes", len(body))
+    st.markdown(body, unsafe_allow_html=True)
+
+# 리런 한 번(전체 또는 두더지판 fragment)마다 한 번씩: 리런 수 + 이 세션이 지금 어느 페이지에 있는지
+def count_rerun():
+    ops.COUNTERS.add("rerun")
+    ops.COUNTERS.touch(st.session_state.session_key, st.session_state.page)
+
+# [추가] 문제판은 (단, 곱하는 수) 마다 미리 만들어 둔 것을 꺼내 씀 (프로세스당 하나, 뒤에서 계속 채움)
+@st.cache_resource
+def get_problem_pool():
+    # [수정] 미리 채우는 건 기본 범위(2~9단 x 1~9)에 드는 조합만. 나머지는 처음 나올 때 채움
+    return problem_pool.GridPool([dan for dan in DANS if dan in game_core.DANS],
+                                 [m for m in MULTIPLIERS if m in game_core.MULTIPLIERS])
+
+# [추가] 랭킹 저장소는 프로세스당 하나만 열어서 모든 세션이 같이 씀
+@st.cache_resource
+def get_rank_store():
+    store = rank_store.open_store(RANK_BACKEND, RANK_DIR)
+    if RANK_BACKEND == "segments":
+        store.start_compactor()  # 끝난 날짜 세그먼트를 뒤에서 요약에 접어 넣음
+    return store
+
+# [추가] 저장은 전용 writer 스레드 하나가 맡음 (세션끼리 동시에 끝나도 기록이 사라지지 않게)
+# finish_game 은 저널에 한 줄 쓰고 바로 돌아가고, 실제 파일 저장은 뒤에서 묶어서 처리
+@st.cache_resource
+def get_rank_writer():
+    # 리스너는 생성자에서 넘김: 이전 프로세스의 저널에서 재실행되는 기록도 명예의 전당/순위/누적 통계에 반영됨
+    return rank_store.RankWriter(get_rank_store(), journal_dir=RANK_DIR, batch_size=RANK_BATCH_SIZE,
+                                 batch_ms=RANK_BATCH_MS, fsync_policy=RANK_FSYNC,
+                                 listeners=[get_leaderboard().apply, get_rank_index().apply,
+                                            get_player_stats().apply])
+
+# [추가] 명예의 전당: 단별 상위 5개만 메모리에 두고 저장할 때마다 갱신 (매번 파일 전체를 읽지 않음)
+@st.cache_resource
+def get_leaderboard():
+    return leaderboard.Leaderboard(get_rank_store(), k=5)
+
+# [추가] 도전 기록 로그 + 플레이어 누적 통계 (저장 스레드에서 같이 갱신)
+@st.cache_resource
+def get_player_stats():
+    return player_stats.PlayerStats(RANK_DIR)
+
+# [추가] 클리어 화면의 내 순위: 단별/전체 기록을 정렬해 두고 bisect 로 바로 찾음
+@st.cache_resource
+def get_rank_index():
+    return leaderboard.RankIndex(get_rank_store())
+
+# [추가] 선생님용 통계: 계산은 별도 프로세스에서, 결과는 랭킹/도전 로그가 바뀔 때까지 재사용
+@st.cache_resource
+def get_analytics():
+    return analytics.Analytics(get_rank_store(), RANK_BACKEND, RANK_DIR)
+
+# [추가] 판별 클릭 기록: 한 판이 끝날 때 고정 길이 레코드 하나를 세그먼트 파일에 덧붙임
+@st.cache_resource
+def get_telemetry():
+    return telemetry.TelemetryLog(TELEMETRY_DIR)
 
 # [유지] 캐싱 기능 활성화 (이미지 로딩 속도 최적화)
 @st.cache_data
 def load_image_as_base64(filename_no_ext):
-    for ext in [".png", ".jpg", ".jpeg"]:
+    ops.COUNTERS.add("image_miss")  # 캐시에 없을 때만 여기까지 옴
+    for ext in IMG_EXTS:
         path = os.path.join(IMG_DIR, filename_no_ext + ext)
         if os.path.exists(path):
             with open(path, 'rb') as f:
@@ -33,14 +140,87 @@ def load_image_as_base64(filename_no_ext):
                 return f"data:{mime};base64,{encoded}"
     return None
 
-mole_b64 = load_image_as_base64("mole")
-hole_b64 = load_image_as_base64("hole")
-clock_b64 = load_image_as_base64("duck_clock")
+# [추가] 이미지를 static 폴더에 내용 해시 이름으로 복사하고 URL 만 돌려줌
+# 파일이 바뀌면 URL 도 바뀌므로 브라우저 캐시를 그대로 써도 안전함
+# (streamlit 의 정적 파일 서빙은 Cache-Control 을 붙이지 않음. serve.py 로 띄우면 ?v= URL 에 1년 immutable 헤더가 붙음)
+# 매 리런에는 URL 문자열만 전송됨
+@st.cache_resource
+def publish_static_image(filename_no_ext):
+    ops.COUNTERS.add("image_miss")
+    for ext in IMG_EXTS:
+        path = os.path.join(IMG_DIR, filename_no_ext + ext)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            static_name = f"{filename_no_ext}.{digest}{ext}"
+            target = os.path.join(STATIC_DIR, static_name)
+            if not os.path.exists(target):
+                os.makedirs(STATIC_DIR, exist_ok=True)
+                tmp_path = f"{target}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, target)
+            return f"app/static/{static_name}?v={digest}"
+    return None
 
-images_ready = (mole_b64 and hole_b64 and clock_b64)
+def load_image_url(filename_no_ext):
+    ops.COUNTERS.add("image_call")
+    if ASSET_MODE == "inline":
+        return load_image_as_base64(filename_no_ext)
+    return publish_static_image(filename_no_ext)
+
+# [추가] 표시 크기에 맞춘 변형(1x/2x, WebP/AVIF) 빌드. 바뀐 원본만 다시 만들고, Pillow 가 없으면 원본을 씀
+@st.cache_resource
+def load_image_manifest():
+    if ASSET_MODE == "inline":
+        return {}
+    try:
+        return image_pipeline.build(IMG_DIR, STATIC_DIR, image_pipeline.DISPLAY_HEIGHTS)  # Pillow 는 build 안에서 import
+    except ImportError:
+        return {}
+
+def background_css(filename_no_ext):
+    manifest = load_image_manifest()
+    if manifest:
+        css = image_pipeline.css_background(manifest, filename_no_ext, image_pipeline.DISPLAY_HEIGHTS[filename_no_ext])
+        if css:
+            return css
+    return f'background-image: url("{load_image_url(filename_no_ext)}") !important;'
+
+mole_img = load_image_url("mole")
+hole_img = load_image_url("hole")
+clock_img = load_image_url("duck_clock")
+
+images_ready = (mole_img and hole_img and clock_img)
+if images_ready:
+    mole_css = background_css("mole")
+    hole_css = background_css("hole")
+    clock_css = background_css("duck_clock")
+
+# [수정] 두더지판 스타일: 칸마다 <style> 블록을 새로 만들지 않고 고정 스타일시트 하나로 정의
+# 버튼 key 를 mole_{idx} / hole_{idx} 로 주면 streamlit 이 st-key-mole_3 같은 클래스를 붙이므로
+# 리런마다 바뀌는 건 9칸의 상태(key)와 숫자뿐이고, 아래 CSS 문자열은 항상 같음
+GRID_CSS = f"""
+    [class*="st-key-mole_"] button, [class*="st-key-hole_"] button {{
+        background-size: contain !important;
+        background-repeat: no-repeat !important;
+        background-position: center center !important;
+        background-color: transparent !important;
+        border: none !important;
+        height: 100px !important;
+        width: 100% !important;
+    }}
+    [class*="st-key-mole_"] button {{ {mole_css} }}
+    [class*="st-key-hole_"] button {{ {hole_css} }}
+    [class*="st-key-mole_"] button:hover, [class*="st-key-hole_"] button:hover {{
+        background-color: rgba(0,0,0,0.1) !important;
+    }}
+""" if images_ready else ""
 
 # --- 2. CSS 스타일 ---
-st.markdown(f"""
+with timed("css"):
+    html(f"""
     <style>
     .stApp {{ background-color: #8D6E63; }}
     
@@ -74,169 +254,145 @@ st.markdown(f"""
         from {{ opacity: 0; transform: translateY(-10px); }}
         to {{ opacity: 1; transform: translateY(0); }}
     }}
+    {GRID_CSS}
     </style>
-""", unsafe_allow_html=True)
+    """)
 
 # --- 3. JavaScript 타이머 ---
-def render_js_timer(server_elapsed_time, penalty_time, background_img):
-    timer_html = f"""
-    <style>
-        .js-clock-container {{
-            position: relative;
-            width: 160px; height: 160px;
-            margin: 0 auto;
-            background-color: transparent;
-            background-image: url("{background_img}");
-            background-size: contain;
-            background-repeat: no-repeat;
-            background-position: center;
-            display: flex; justify-content: center; align-items: center;
-        }}
-        .js-clock-text {{
-            font-size: 38px; font-weight: bold; color: #333;
-            margin-top: 0px; 
-            padding-bottom: 15px;
-            text-shadow: 1px 1px 0px white;
-            font-family: sans-serif;
-            white-space: nowrap;
-        }}
-    </style>
-    <div class="js-clock-container">
-        <div id="timer-display" class="js-clock-text">0.0</div>
-    </div>
-    <script>
-        const initialElapsed = {server_elapsed_time};
-        const penalty = {penalty_time};
-        const localStartTime = new Date().getTime() / 1000 - initialElapsed;
-
-        function updateTimer() {{
-            const now = new Date().getTime() / 1000;
-            const totalElapsed = Math.max(0, now - localStartTime + penalty);
-            const display = document.getElementById("timer-display");
-            if(display) {{ display.innerText = totalElapsed.toFixed(1); }}
-        }}
-        setInterval(updateTimer, 50);
-    </script>
-    """
-    components.html(timer_html, height=170)
+# [수정] 매 리런마다 iframe 을 새로 만들던 components.html 대신 key 가 고정된 컴포넌트를 사용
+# 한 게임 동안 iframe 은 그대로 살아 있고, 리런 때는 (elapsed, penalty) 값만 전달됨
+duck_timer = components.declare_component("duck_timer", path=os.path.join(COMPONENT_DIR, "duck_timer"))
+
+def render_js_timer(server_elapsed_time, penalty_time, background_css):
+    with timed("timer"):
+        duck_timer(
+            elapsed=server_elapsed_time, penalty=penalty_time, background_css=background_css,
+            key=f"timer_{st.session_state.game_id}", default=None,
+        )
+
+# [추가] 빠른 모드 컴포넌트: 한 판 전체를 브라우저에서 진행하고 결과만 한 번 돌려줌
+mole_round = components.declare_component("mole_round", path=os.path.join(COMPONENT_DIR, "mole_round"))
 
 # --- 4. 게임 로직 ---
 
-TARGET_COUNT = 9
+# [수정] 랭킹 필터: 지금 설정한 단 + 예전 설정으로 쌓인 기록의 단 (숫자 순)
+def rank_filters():
+    labels = {rank_store.dan_label(dan) for dan in DANS}
+    try:
+        labels |= set(get_leaderboard().labels())
+    except (OSError, ValueError, rank_store.RankStoreError): pass  # 저장소를 못 읽으면 지금 설정한 단만 (load_ranking 과 같음)
+    return ["전체"] + sorted(labels, key=lambda label: (0, int(label[:-1])) if label[:-1].isdigit() else (1, label))
+
+# "1부터 9까지" / 띄엄띄엄이면 "2, 5, 7 중에서"
+def range_text(values):
+    if len(values) > 1 and values[-1] - values[0] == len(values) - 1:
+        return f"{values[0]}부터 {values[-1]}까지"
+    return ", ".join(map(str, values)) + " 중에서"
+
+BOARD_PAGE_SIZE = 20
+PLAY_MODES = ["기본", "빠른 모드"]
 
-# [수정됨] 기록 저장 로직: 기존 기록 확인 후 갱신
 def save_record(name, dan, record_time):
-    rows = []
-    updated = False
-    
-    # 기존 파일 읽기
-    if os.path.exists(RANK_FILE):
-        with open(RANK_FILE, mode='r', encoding='utf-8') as f:
-            reader = csv.reader(f)
-            header = next(reader, None)
-            if header:
-                rows.append(header)
-                for row in reader:
-                    # row = [이름, 단, 기록, 날짜]
-                    if len(row) < 4: continue # 데이터 깨짐 방지
-                    
-                    saved_name = row[0]
-                    saved_dan = row[1]
-                    saved_time = float(row[2])
-                    
-                    # 같은 이름, 같은 단인 경우
-                    if saved_name == name and saved_dan == f"{dan}단":
-                        if record_time < saved_time: # 신기록이면 갱신
-                            row[2] = f"{record_time:.2f}"
-                            row[3] = datetime.now().strftime("%Y-%m-%d")
-                            updated = True
-                        else:
-                            # 기존 기록이 더 좋으면 유지하되, 업데이트 처리된 것으로 간주
-                            updated = True
-                    rows.append(row)
-    
-    # 새로운 도전(리스트에 없던 경우)이라면 추가
-    if not updated:
-        date_str = datetime.now().strftime("%Y-%m-%d")
-        rows.append([name, f"{dan}단", f"{record_time:.2f}", date_str])
-    
-    # 파일에 다시 쓰기
-    with open(RANK_FILE, mode='w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
+    with timed("save_record"):
+        get_rank_writer().submit(name, dan, record_time)
 
+# [수정] pandas 없이 (이름, 단, "12.34초", 날짜) 튜플 목록으로 돌려줌
 def load_ranking(dan_filter="전체"):
     try:
-        df = pd.read_csv(RANK_FILE)
-        df["기록(초)"] = pd.to_numeric(df["기록(초)"], errors='coerce')
-        if dan_filter != "전체":
-            df = df[df["단"] == dan_filter]
-        df = df.sort_values(by="기록(초)", ascending=True).head(5)
-        df.index = range(1, len(df) + 1)
-        df["기록(초)"] = df["기록(초)"].apply(lambda x: f"{x:.2f}초")
-        return df[["이름", "단", "기록(초)", "날짜"]]
-    except: return pd.DataFrame()
-
-def generate_new_problem(dan):
-    if 'problem_deck' not in st.session_state or not st.session_state.problem_deck:
-        st.session_state.problem_deck = list(range(1, 10))
-        random.shuffle(st.session_state.problem_deck)
-    
-    multiplier = st.session_state.problem_deck.pop(0)
-    answer = dan * multiplier
-    
-    grid_numbers = [answer]
-    while len(grid_numbers) < 9:
-        wrong = random.randint(1, 81)
-        if wrong != answer and wrong not in grid_numbers:
-            grid_numbers.append(wrong)
-    random.shuffle(grid_numbers)
-    
-    answer_idx = grid_numbers.index(answer)
-    indices = list(range(9))
-    indices.remove(answer_idx)
-    wrong_mole_idx = random.choice(indices)
-    
-    return {
-        'problem': f"{dan} x {multiplier}",
-        'answer': answer,
-        'grid': grid_numbers,
-        'correct_mole_idx': answer_idx,
-        'wrong_mole_idx': wrong_mole_idx
-    }
-
+        with timed("load_ranking"):
+            rows = get_leaderboard().top(None if dan_filter == "전체" else dan_filter)
+    except (OSError, ValueError, rank_store.RankStoreError): return []
+    return [(name, label, f"{record_time:.2f}초", date_str) for name, label, record_time, date_str in rows]
+
+def show_table(rows, columns, start=1):
+    import pandas as pd  # 표를 그릴 때만 불러옴 (서버 시작/게임 화면에서는 필요 없음)
+    df = pd.DataFrame(rows, columns=columns, index=range(start, start + len(rows)))
+    st.dataframe(df, use_container_width=True, hide_index=False)
+
+def show_ranking_table(rows, start=1):
+    show_table(rows, ["이름", "단", "기록(초)", "날짜"], start)
+
+# [추가] 전체 순위 한 페이지: 이전 페이지 마지막 (기록, 이름, 단) 다음부터
+# sqlite 백엔드는 인덱스에서 필요한 만큼만 읽고, csv/kv/segments 는 전체를 정렬한 뒤 자름
+# 다음 페이지가 있는지 알기 위해 하나 더 읽어서 (행 목록, 다음 커서) 를 돌려줌
+def load_ranking_page(dan_filter, after, date_from=None, date_to=None, name_prefix=""):
+    try:
+        rows = get_rank_store().page(
+            None if dan_filter == "전체" else dan_filter, after=after, limit=BOARD_PAGE_SIZE + 1,
+            date_from=date_from, date_to=date_to, name_prefix=name_prefix.strip(),
+        )
+    except (OSError, ValueError, rank_store.RankStoreError): return [], None
+    next_cursor = None
+    if len(rows) > BOARD_PAGE_SIZE:
+        rows = rows[:BOARD_PAGE_SIZE]
+        last = rows[-1]
+        next_cursor = (last[2], last[0], last[1])
+    return [(name, label, f"{record_time:.2f}초", date_str) for name, label, record_time, date_str in rows], next_cursor
+
+# [추가] 한 판의 클릭 기록을 telemetry 세그먼트에 남김 (기록 저장과 별개라 실패해도 게임은 계속)
+def log_round(mode, elapsed, penalty, clicks):
+    try:
+        get_telemetry().append(
+            telemetry.now_ms() - int(elapsed * 1000), elapsed * 1000, penalty * 1000,
+            st.session_state.setting_dan, mode, clicks,
+        )
+    except (OSError, ValueError, struct.error):
+        pass  # ValueError/struct.error: 레코드에 넣을 수 없는 값 (기록이 게임 진행을 막지 않게)
+
+# [수정] 채점/진행은 game_core 가 하고, 여기서는 상태를 세션에 넣고 알림 메시지만 고름
 def check_answer(idx):
-    current = st.session_state.game_state
-    if current is None: return
+    game = st.session_state.game
+    if game is None: return
+    game, outcome = game_core.click(game, idx, time.time(), pool=get_problem_pool())
+    st.session_state.game = game
 
     # 알림 메시지 업데이트
-    if idx == current['correct_mole_idx']:
-        st.session_state.caught_count += 1
-        st.session_state.feedback_msg = f"🟢 잡았다!<br>({st.session_state.caught_count}/{TARGET_COUNT})"
+    if outcome == game_core.CORRECT:
+        st.session_state.feedback_msg = f"🟢 잡았다!<br>({game.solved}/{game_core.TARGET_COUNT})"
         st.session_state.feedback_color = "#E8F5E9" 
-        
-        if st.session_state.caught_count >= TARGET_COUNT:
+        if game.finished_at is not None:
             finish_game()
-        else:
-            st.session_state.game_state = generate_new_problem(st.session_state.setting_dan)
-            
-    elif idx == current['wrong_mole_idx']:
+    elif outcome == game_core.TRAP:
         st.session_state.feedback_msg = "💥 함정!<br>+3초"
         st.session_state.feedback_color = "#FFEBEE" 
-        st.session_state.penalty_time += 3.0 
-    else:
+    elif outcome == game_core.EMPTY:
         st.session_state.feedback_msg = "❌ 빈 땅!<br>+1초"
         st.session_state.feedback_color = "#FFF3E0" 
-        st.session_state.penalty_time += 1.0
 
 def finish_game():
-    end_time = time.time()
-    start = st.session_state.get('start_time', end_time)
-    final_record = (end_time - start) + st.session_state.penalty_time
+    game = st.session_state.game
+    final_record = game_core.record(game)
     st.session_state.final_record = final_record
     save_record(st.session_state.user_name, st.session_state.setting_dan, final_record)
+    log_round(telemetry.MODE_CLASSIC, game_core.elapsed(game), game.penalty, game.clicks)
     st.session_state.page = 'clear'
 
+def finish_client_round(result):
+    # 이미 처리한 판의 값이 다시 오면 무시 (처리했으면 True)
+    if not isinstance(result, dict) or result.get('round_id') != st.session_state.round_id:
+        return False
+    if result.get('ready'):
+        # 준비 신호: 이제 덱을 보냄. 이미 보냈으면 (같은 값이 리런마다 다시 옴) 무시
+        if st.session_state.round_issued_at is not None:
+            return False
+        st.session_state.round_issued_at = time.time()
+        return True
+    if st.session_state.round_issued_at is None:
+        st.session_state.round_rejected = True  # 덱을 받기 전에 끝났다는 결과
+        return True
+    st.session_state.round_id = None
+    server_elapsed = time.time() - st.session_state.round_issued_at
+    replayed = game_core.replay_round(st.session_state.round_deck, result.get('events'), server_elapsed)
+    if replayed is None:
+        st.session_state.round_rejected = True
+        return True
+    final_record, penalty, clicks = replayed
+    st.session_state.final_record = final_record
+    save_record(st.session_state.user_name, st.session_state.setting_dan, final_record)
+    log_round(telemetry.MODE_FAST, final_record - penalty, penalty, clicks)
+    st.session_state.page = 'clear'
+    return True
+
 # --- 5. 페이지 이동 함수들 ---
 def toggle_help():
     st.session_state.show_help = not st.session_state.get('show_help', False)
@@ -250,35 +406,165 @@ def go_to_game():
         return
     st.session_state.user_name = st.session_state.temp_name
     st.session_state.setting_dan = st.session_state.temp_dan
-    st.session_state.caught_count = 0
-    st.session_state.penalty_time = 0.0
-    st.session_state.game_state = None
+    st.session_state.game = None  # 첫 화면을 그릴 때 시작 (그때부터 시간을 잼)
     
     st.session_state.feedback_msg = "시작!"
     st.session_state.feedback_color = "#FFFFFF"
     
-    deck = list(range(1, 10))
-    random.shuffle(deck)
-    st.session_state.problem_deck = deck
+    st.session_state.game_id = f"{time.time_ns():x}{random.getrandbits(32):08x}"
+    st.session_state.play_mode = st.session_state.get('temp_mode', PLAY_MODES[0])
+    if st.session_state.play_mode == "빠른 모드":
+        st.session_state.round_deck = game_core.build_round_deck(st.session_state.setting_dan, pool=get_problem_pool(),
+                                                                   multipliers=MULTIPLIERS)
+        st.session_state.round_id = st.session_state.game_id
+        st.session_state.round_issued_at = None  # 컴포넌트가 준비 신호를 보내면 그때 덱을 보내고 시간을 잼
+        st.session_state.round_rejected = False
     
     st.session_state.page = 'playing'
 
 def go_home(): 
     st.session_state.page = 'intro'
 
-# --- 6. 메인 UI ---
+def go_to_profile():
+    st.session_state.profile_name = st.session_state.get('user_name', "")
+    st.session_state.page = 'profile'
+
+def go_to_stats():
+    st.session_state.page = 'stats'
+
+def go_to_board():
+    reset_board_cursor()
+    st.session_state.page = 'board'
+
+# 전체 순위 페이지 이동: 각 페이지의 시작 커서를 스택으로 쌓음 (첫 페이지는 None)
+def reset_board_cursor():
+    st.session_state.board_cursors = [None]
+
+def next_board_page(cursor):
+    st.session_state.board_cursors.append(cursor)
+
+def prev_board_page():
+    if len(st.session_state.board_cursors) > 1:
+        st.session_state.board_cursors.pop()
+
+# --- 6. 두더지판 (fragment) ---
+@st.fragment
+def render_board():
+    global board_drawn
+    board_started = time.thread_time()
+    board_wall = time.perf_counter()
+    # 마지막 정답으로 clear 페이지가 되었으면 전체 앱을 다시 실행
+    if st.session_state.page != 'playing':
+        st.rerun()
+
+    game = st.session_state.game
+    problem = game.problem
+
+    t1, t2, t3 = st.columns([1, 2, 1])
+    
+    with t1:
+        st.write("")
+        st.write("")
+        st.markdown(f"🎯 목표: **{game.solved} / {game_core.TARGET_COUNT}**")
+
+    with t2:
+        render_js_timer(game_core.elapsed(game, time.time()), game.penalty, clock_css)
+    
+    with t3:
+        st.write("") 
+        st.write("")
+        if st.session_state.feedback_msg:
+            html(f"""
+            <div class='feedback-box' style='background-color:{st.session_state.feedback_color};'>
+                {st.session_state.feedback_msg}
+            </div>
+            """)
+
+    html(f"<div class='question-box'>{problem['problem']} = ?</div>")
+
+    with timed("grid"):
+        for row in range(3):
+            cols = st.columns(3)
+            for col in range(3):
+                idx = row * 3 + col
+                
+                is_mole = idx == problem['correct_mole_idx'] or idx in problem['trap_indices']
+                number = problem['grid'][idx]
+                btn_key = f"mole_{idx}" if is_mole else f"hole_{idx}"
+
+                with cols[col]:
+                    st.button(" ", key=btn_key, on_click=check_answer, args=(idx,), use_container_width=True)
+                    html(f"<div class='number-label'>{number}</div>")
+
+    metrics.observe("board", 'playing', time.perf_counter() - board_wall)
+    board_drawn = True
+    count_rerun()
+    if SHOW_RERUN_TIMING:
+        st.caption(f"⏱️ 두더지판 CPU {(time.thread_time() - board_started) * 1000:.2f} ms")
+
+# --- 7. 메인 UI ---
 if 'page' not in st.session_state: st.session_state.page = 'intro'
 if 'show_help' not in st.session_state: st.session_state.show_help = False
 if 'feedback_msg' not in st.session_state: st.session_state.feedback_msg = ""
 if 'feedback_color' not in st.session_state: st.session_state.feedback_color = "#FFFFFF"
+if 'session_key' not in st.session_state: st.session_state.session_key = f"{random.getrandbits(64):016x}"
+get_ops_monitor()
+board_drawn = False  # 이번 리런에서 두더지판이 리런을 이미 셌는지
 
 if not images_ready:
     st.error("⚠️ 이미지 로드 실패! images 폴더 확인 필요.")
     st.stop()
 
+# [PAGE 0] 관리자 (숨김): 운영 현황 + 구간별 시간 히스토그램
+if ADMIN_TOKEN and st.query_params.get("admin") == ADMIN_TOKEN:
+    html("<div class='title-box'>🛠️ 관리자</div>")
+    st.button("🔄 새로고침", use_container_width=True)
+
+    # 링 버퍼(1초 샘플)만 읽으므로 세션 수와 상관없이 가벼움
+    monitor = get_ops_monitor()
+    summary = monitor.summary()
+    if summary is None:
+        st.info("운영 현황 샘플을 모으는 중이에요. 잠시 후 새로고침 해 주세요.")
+    else:
+        with st.container(border=True):
+            st.caption(f"최근 {summary['seconds']:.0f}초 기준 · 서버 시작 후 리런 {summary['total_reruns']}번")
+            o1, o2, o3 = st.columns(3)
+            o1.metric("접속 중", f"{sum(summary['sessions'].values())}명", help=f"마지막 리런이 {ops.ACTIVE_WINDOW:.0f}초 안인 세션")
+            o2.metric("초당 리런", f"{summary['reruns_per_sec']:.1f}")
+            o3.metric("리런당 HTML", f"{summary['html_bytes_per_rerun'] / 1024:.1f} KB")
+            o4, o5, o6 = st.columns(3)
+            latency = summary['write_latency_ms']
+            o4.metric("초당 기록 저장", f"{summary['writes_per_sec']:.1f}", help=f"저장 대기 {summary['write_queue']}건")
+            o5.metric("저장 지연", "-" if latency is None else f"{latency:.1f} ms", help="submit 부터 저장 완료까지 평균")
+            hit_rate = summary['image_hit_rate'] if summary['image_hit_rate'] is not None else summary['total_image_hit_rate']
+            o6.metric("이미지 캐시 적중", "-" if hit_rate is None else f"{hit_rate * 100:.1f}%")
+            if summary['write_failed']:
+                st.warning(f"저장하지 못한 기록 {summary['write_failed']}건 (저널에 남아 다음 시작 때 다시 저장): "
+                           f"{summary['write_error']}")
+        if summary['sessions']:
+            show_table(sorted(summary['sessions'].items()), ["페이지", "세션 수"])
+        series = monitor.series()
+        if series:
+            import pandas as pd  # 차트를 그릴 때만 불러옴
+            chart = pd.DataFrame(series, columns=["초", "초당 리런", "초당 저장", "접속 중"]).set_index("초")
+            st.line_chart(chart[["초당 리런", "초당 저장"]])
+
+    st.markdown("**구간별 시간**")
+    if not metrics.ENABLED:
+        st.info("METRICS=1 로 서버를 시작하면 구간별 시간을 모읍니다.")
+    else:
+        st.caption(f"Prometheus: http://127.0.0.1:{metrics.PORT}/metrics")
+        sections = metrics.REGISTRY.sections()
+        if sections:
+            show_table([(section, page, count, f"{mean * 1000:.2f}", f"≤{p50 * 1000:g}", f"≤{p95 * 1000:g}")
+                        for section, page, count, mean, p50, p95 in sections],
+                       ["구간", "페이지", "횟수", "평균 ms", "p50 ms", "p95 ms"])
+        with st.expander("Prometheus 텍스트"):
+            st.code(metrics.REGISTRY.render(), language="text")
+
 # [PAGE 1] 인트로
-if st.session_state.page == 'intro':
-    st.markdown("<div class='title-box'>🐣 럭키덕키 타임어택 🐣</div>", unsafe_allow_html=True)
+elif st.session_state.page == 'intro':
+    html("<div class='title-box'>🐣 럭키덕키 타임어택 🐣</div>")
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
@@ -290,10 +576,10 @@ if st.session_state.page == 'intro':
         
         if st.session_state.show_help:
             with st.container(border=True):
-                st.markdown("""
+                st.markdown(f"""
                 ### 🐹 게임 규칙 설명
                 **1. 스피드 타임어택!** ⏱️
-                * 선택한 구구단의 **x1 ~ x9 (총 9문제)**가 무작위로 나옵니다.
+                * 선택한 구구단의 **{range_text(MULTIPLIERS)} 곱셈 (총 {game_core.TARGET_COUNT}문제)**가 무작위로 나옵니다.
                 * 모든 문제를 **가장 짧은 시간** 안에 푸는 것이 목표!
                 
                 **2. 조작 방법** 🎮
@@ -308,105 +594,194 @@ if st.session_state.page == 'intro':
                     st.rerun()
 
         st.write("---")
-        st.markdown("<h4 style='text-align:center; color:white;'>🏆 명예의 전당</h4>", unsafe_allow_html=True)
+        html("<h4 style='text-align:center; color:white;'>🏆 명예의 전당</h4>")
         
-        filter_options = ["전체"] + [f"{i}단" for i in range(2, 10)]
-        selected_filter = st.selectbox("랭킹 보기", filter_options)
+        selected_filter = st.selectbox("랭킹 보기", rank_filters())
         ranking = load_ranking(selected_filter)
         
-        if not ranking.empty:
-            st.dataframe(ranking, use_container_width=True, hide_index=False)
+        if ranking:
+            show_ranking_table(ranking)
         else:
             st.info(f"아직 {selected_filter} 기록이 없습니다.")
+        r1, r2 = st.columns(2)
+        with r1: st.button("📜 전체 순위 보기", on_click=go_to_board, use_container_width=True)
+        with r2: st.button("📈 내 기록 보기", on_click=go_to_profile, use_container_width=True)
+        st.button("📊 선생님용 통계", on_click=go_to_stats, use_container_width=True)
 
 # [PAGE 2] 설정
 elif st.session_state.page == 'setup':
     st.button("🏠 처음으로", on_click=go_home)
     
-    st.markdown("<div class='title-box'>⚙️ 도전 준비</div>", unsafe_allow_html=True)
+    html("<div class='title-box'>⚙️ 도전 준비</div>")
     with st.container(border=True):
         st.text_input("도전자 이름", key="temp_name", placeholder="이름을 입력하세요")
-        st.selectbox("구구단 선택", range(2, 10), key="temp_dan")
-        st.info(f"💡 {st.session_state.get('temp_dan', 2)}단의 1부터 9까지 곱셈이 랜덤하게 나옵니다! (총 {TARGET_COUNT}문제)")
+        st.selectbox("구구단 선택", DANS, key="temp_dan")
+        st.radio("플레이 방식", PLAY_MODES, key="temp_mode", horizontal=True,
+                 help="빠른 모드는 한 판을 브라우저에서 진행하고 끝날 때 한 번만 서버에 보냅니다.")
+        st.info(f"💡 {st.session_state.get('temp_dan', DANS[0])}단의 {range_text(MULTIPLIERS)} 곱셈이 랜덤하게 나옵니다! (총 {game_core.TARGET_COUNT}문제)")
         st.button("🔥 게임 스타트!", on_click=go_to_game, use_container_width=True, type="primary")
 
+# [PAGE 3-1] 게임 플레이 (빠른 모드: 컴포넌트가 한 판 전체를 진행)
+elif st.session_state.page == 'playing' and st.session_state.get('play_mode') == "빠른 모드":
+    c1, c2 = st.columns([2, 1])
+    with c1: st.markdown(f"**👤 {st.session_state.user_name}** ({st.session_state.setting_dan}단)")
+    with c2: st.button("❌ 포기하기", on_click=go_home, use_container_width=True)
+
+    if st.session_state.round_rejected:
+        st.error("기록을 확인할 수 없어요. 다시 도전해 주세요!")
+        st.button("🏠 홈으로 이동", on_click=go_home, use_container_width=True, type="primary")
+    else:
+        result = mole_round(
+            round_id=st.session_state.round_id,
+            deck=st.session_state.round_deck if st.session_state.round_issued_at is not None else None,
+            mole_css=mole_css, hole_css=hole_css,
+            key=f"round_{st.session_state.round_id}", default=None,
+        )
+        if result is not None and finish_client_round(result):
+            st.rerun()
+
 # [PAGE 3] 게임 플레이
+# [수정] 두더지판/알림/카운터/타이머는 fragment 안에서 그려서, 클릭 시 이 부분만 다시 실행됨
+# (set_page_config, 전역 CSS, 상단 이름/포기 버튼은 게임 시작과 끝에만 실행)
 elif st.session_state.page == 'playing':
-    if st.session_state.game_state is None:
-        st.session_state.game_state = generate_new_problem(st.session_state.setting_dan)
-        st.session_state.start_time = time.time()
+    if st.session_state.game is None:
+        st.session_state.game = game_core.start_round(st.session_state.setting_dan, time.time(), pool=get_problem_pool(),
+                                                      multipliers=MULTIPLIERS)
     
-    game = st.session_state.game_state
-    
-    c1, c2, c3 = st.columns([1, 1, 1])
+    c1, c3 = st.columns([2, 1])
     with c1: st.markdown(f"**👤 {st.session_state.user_name}** ({st.session_state.setting_dan}단)")
-    with c2: st.markdown(f"🎯 목표: **{st.session_state.caught_count} / {TARGET_COUNT}**")
-    
     with c3:
         st.button("❌ 포기하기", on_click=go_home, use_container_width=True)
 
-    t1, t2, t3 = st.columns([1, 2, 1])
-    
-    with t2:
-        current_server_time = time.time()
-        elapsed_server = current_server_time - st.session_state.start_time
-        render_js_timer(elapsed_server, st.session_state.penalty_time, clock_b64)
-    
-    with t3:
-        st.write("") 
-        st.write("")
-        if st.session_state.feedback_msg:
-            st.markdown(f"""
-            <div class='feedback-box' style='background-color:{st.session_state.feedback_color};'>
-                {st.session_state.feedback_msg}
-            </div>
-            """, unsafe_allow_html=True)
-
-    st.markdown(f"<div class='question-box'>{game['problem']} = ?</div>", unsafe_allow_html=True)
-
-    for row in range(3):
-        cols = st.columns(3)
-        for col in range(3):
-            idx = row * 3 + col
-            
-            is_correct = (idx == game['correct_mole_idx'])
-            is_wrong = (idx == game['wrong_mole_idx'])
-            bg_url = mole_b64 if (is_correct or is_wrong) else hole_b64
-            
-            number = game['grid'][idx]
-            btn_key = f"btn_{idx}"
-
-            st.markdown(f"""
-            <style>
-            .st-key-{btn_key} button {{
-                background-image: url("{bg_url}") !important;
-                background-size: contain !important;
-                background-repeat: no-repeat !important;
-                background-position: center center !important;
-                background-color: transparent !important;
-                border: none !important;
-                height: 100px !important;
-                width: 100% !important;
-            }}
-            .st-key-{btn_key} button:hover {{ background-color: rgba(0,0,0,0.1) !important; }}
-            </style>
-            """, unsafe_allow_html=True)
-            
-            with cols[col]:
-                st.button(" ", key=btn_key, on_click=check_answer, args=(idx,), use_container_width=True)
-                st.markdown(f"<div class='number-label'>{number}</div>", unsafe_allow_html=True)
+    render_board()
+
+# [PAGE 5] 전체 순위 (페이지 단위로 넘겨 보기)
+elif st.session_state.page == 'board':
+    st.button("🏠 처음으로", on_click=go_home)
+    html("<div class='title-box'>📜 전체 순위</div>")
+
+    with st.container(border=True):
+        f1, f2 = st.columns(2)
+        with f1: st.selectbox("단", rank_filters(), key="board_dan", on_change=reset_board_cursor)
+        with f2: st.text_input("이름 검색", key="board_prefix", placeholder="이름 앞글자", on_change=reset_board_cursor)
+        dates = st.date_input("날짜 범위", value=(), key="board_dates", on_change=reset_board_cursor)
+
+    date_from = dates[0].isoformat() if len(dates) >= 1 else None
+    date_to = dates[1].isoformat() if len(dates) >= 2 else date_from
+    cursors = st.session_state.board_cursors
+    page_rows, next_cursor = load_ranking_page(
+        st.session_state.board_dan, cursors[-1], date_from, date_to, st.session_state.board_prefix)
+
+    if page_rows:
+        show_ranking_table(page_rows, start=(len(cursors) - 1) * BOARD_PAGE_SIZE + 1)
+    else:
+        st.info("조건에 맞는 기록이 없습니다.")
+
+    p1, p2, p3 = st.columns([1, 1, 1])
+    with p1: st.button("◀ 이전", on_click=prev_board_page, disabled=len(cursors) <= 1, use_container_width=True)
+    with p2: html(f"<div style='text-align:center; color:white;'>{len(cursors)} 페이지</div>")
+    with p3: st.button("다음 ▶", on_click=next_board_page, args=(next_cursor,), disabled=next_cursor is None, use_container_width=True)
+
+# [PAGE 6] 내 기록 (누적 통계만 읽음)
+elif st.session_state.page == 'profile':
+    st.button("🏠 처음으로", on_click=go_home)
+    html("<div class='title-box'>📈 내 기록</div>")
+    st.text_input("도전자 이름", key="profile_name", placeholder="이름을 입력하세요")
+
+    profile_name = st.session_state.profile_name.strip()
+    profile = get_player_stats().profile(profile_name) if profile_name else None
+    if profile_name and profile is None:
+        st.info(f"아직 {profile_name}님의 도전 기록이 없습니다.")
+    elif profile:
+        with st.container(border=True):
+            m1, m2, m3, m4 = st.columns(4)
+            m1.metric("도전 횟수", f"{profile['attempts']}번")
+            m2.metric("평균 기록", f"{profile['mean']:.2f}초")
+            m3.metric("최고 기록", f"{profile['best']:.2f}초")
+            m4.metric("연속 도전", f"{profile['streak']}일", help=f"최장 {profile['best_streak']}일 · 마지막 {profile['last_date']}")
+        show_table([(label, f"{count}번", f"{best:.2f}초") for label, count, best in profile['dans']],
+                   ["단", "도전 횟수", "최고 기록"])
+
+# [PAGE 7] 선생님용 통계 (단별 분포 / 날짜별 추이)
+elif st.session_state.page == 'stats':
+    st.button("🏠 처음으로", on_click=go_home)
+    html("<div class='title-box'>📊 선생님용 통계</div>")
+
+    stats, refreshing = get_analytics().snapshot()
+    stats_error = get_analytics().last_error
+    if stats is None:
+        if stats_error and not refreshing:
+            st.error(f"통계를 계산하지 못했어요: {stats_error}")
+        else:
+            st.info("통계를 계산하고 있어요. 잠시 후 새로고침 해 주세요.")
+        st.button("🔄 새로고침", use_container_width=True)
+    else:
+        if stats_error and not refreshing:
+            st.warning(f"최근 기록으로 통계를 다시 계산하지 못했어요 (조금 전 통계를 보여줍니다): {stats_error}")
+        if refreshing:
+            st.caption("새 기록을 반영하는 중이에요. 지금 보이는 값은 조금 전 통계입니다.")
+        with st.container(border=True):
+            m1, m2 = st.columns(2)
+            m1.metric("기록이 있는 도전자", f"{stats['players']}명", help="(이름, 단) 별 최고 기록 수")
+            m2.metric("전체 도전 횟수", f"{stats['attempts']}번")
+
+        dan_labels = list(stats['dans'])
+        if dan_labels:
+            label = st.selectbox("단", dan_labels, key="stats_dan")
+            dist = stats['dans'][label]
+            pct = dist['percentiles']
+            show_table([(f"{dist['count']}명", f"{dist['mean']:.2f}초")
+                        + tuple(f"{pct[p]:.2f}초" for p in analytics.PERCENTILES)],
+                       ["도전자", "평균"] + [f"상위 {p}%" for p in analytics.PERCENTILES])
+            st.bar_chart(dict(zip(analytics.hist_labels(), dist['hist'])), x_label="기록", y_label="도전자 수")
+        else:
+            st.info("아직 기록이 없습니다.")
+
+        if stats['daily']:
+            import pandas as pd  # 차트를 그릴 때만 불러옴
+            daily = pd.DataFrame(stats['daily'], columns=["날짜", "도전 횟수", "기록 중앙값(초)"]).set_index("날짜")
+            st.markdown("**날짜별 추이**")
+            st.line_chart(daily["도전 횟수"])
+            st.line_chart(daily["기록 중앙값(초)"])
 
 # [PAGE 4] 클리어
 elif st.session_state.page == 'clear':
     st.balloons()
-    st.markdown("<div class='title-box'>🎉 축하합니다! 🎉</div>", unsafe_allow_html=True)
+    html("<div class='title-box'>🎉 축하합니다! 🎉</div>")
     with st.container(border=True):
-        st.markdown(f"""
+        html(f"""
         <div style='text-align:center; font-size:24px;'>
             <b>{st.session_state.user_name}</b>님의 기록<br>
             <span style='font-size:48px; color:#E91E63; font-weight:bold;'>{st.session_state.final_record:.2f}초</span>
         </div>
-        """, unsafe_allow_html=True)
+        """)
+
+        # [추가] 내 순위 (개인 최고 기록 기준)
+        try:
+            rank = get_rank_index().rank_of(st.session_state.user_name, st.session_state.setting_dan,
+                                            st.session_state.final_record)
+        except (OSError, ValueError, rank_store.RankStoreError):
+            rank = None
+        if rank:
+            html(f"""
+            <div style='text-align:center; font-size:20px; margin:10px 0;'>
+                🏅 {st.session_state.setting_dan}단 <b>{rank['dan_rank']}등</b> / {rank['dan_total']}명
+                · 전체 <b>{rank['all_rank']}등</b> / {rank['all_total']}명<br>
+                <span style='font-size:16px;'>{st.session_state.setting_dan}단 상위 {rank['top_percent']:.0f}%</span>
+            </div>
+            """)
+            if rank['best'] < round(st.session_state.final_record, 2):
+                st.caption(f"순위는 개인 최고 기록 {rank['best']:.2f}초 기준이에요.")
         
         # [수정] 다시 도전 버튼 삭제, 홈으로 버튼만 유지
-        st.button("🏠 홈으로 이동", on_click=go_home, use_container_width=True, type="primary")
\ No newline at end of file
+        st.button("🏠 홈으로 이동", on_click=go_home, use_container_width=True, type="primary")
+        st.button("📈 내 기록 보기", on_click=go_to_profile, use_container_width=True)
+
+metrics.observe("rerun", st.session_state.page, time.perf_counter() - rerun_started)
+if not board_drawn:
+    count_rerun()
+
+if SHOW_RERUN_TIMING:
+    writer_stats = get_rank_writer().stats()
+    st.caption(f"⏱️ 전체 리런 CPU {(time.thread_time() - script_started) * 1000:.2f} ms · "
+               f"저장 대기 {writer_stats['queue_depth']}건 · 최근 저장 {writer_stats['last_flush_ms']:.1f} ms")
@@ -0,0 +1,201 @@
+# 럭키덕키 게임 엔진 (Streamlit 없이 돌아가는 순수 파이썬)
+# 문제 만들기 / 채점 / 한 판 진행을 st.session_state 와 떼어 놓아서 app.py, test_app.py, 벤치마크가 같이 씀
+#
+# 한 판의 상태는 RoundState (namedtuple, 바꾸지 않음). click() 은 상태를 받아 새 상태를 돌려줌
+#   state = start_round(7, time.time())
+#   state, outcome = click(state, 4, time.time())
+#   if state.finished_at is not None: record(state)
+# 시간(now)과 난수(rng)는 밖에서 넣어 주므로 같은 입력이면 항상 같은 결과 (봇/재현 테스트용)
+# pool (problem_pool.GridPool) 을 넣으면 문제판을 미리 만들어 둔 것에서 꺼내 씀 (앱)
+import collections
+import functools
+import math
+import random
+
+TARGET_COUNT = 9
+DANS = (2, 3, 4, 5, 6, 7, 8, 9)                 # 기본 범위 (앱에서는 DAN_RANGE / MULTIPLIER_RANGE 로 바꿈)
+MULTIPLIERS = (1, 2, 3, 4, 5, 6, 7, 8, 9)
+MAX_NUMBER = 255  # 단 / 곱하는 수 최댓값 (telemetry 레코드에 1바이트로 들어감)
+DISTRACTORS = 8   # 판 하나의 오답 숫자 수 (9칸 - 정답)
+MIN_WINDOW = 12  # 오답을 뽑는 구간의 최소 길이 (작은 단도 판마다 조금씩 달라지게)
+
+# 클릭 결과 (telemetry 레코드에도 이 값이 그대로 들어감)
+CORRECT = 0
+TRAP = 1    # 함정 두더지
+EMPTY = 2   # 빈 땅
+PENALTY = {CORRECT: 0.0, TRAP: 3.0, EMPTY: 1.0}
+
+# 빠른 모드 검증: 브라우저가 보고한 시간이 서버가 잰 시간보다 이만큼 이상 짧으면 무효 (덱 전달 + 결과 전송 왕복 지연 여유)
+# 서버 시간은 컴포넌트가 다 뜬 뒤(준비 신호) 덱을 보낸 때부터 재므로 iframe 로딩 시간은 들어가지 않음
+CLIENT_TIME_SLACK = 3.0
+MAX_ROUND_EVENTS = 500
+
+RoundState = collections.namedtuple("RoundState", [
+    "dan",          # 단
+    "deck",         # 남은 곱하는 수 (tuple)
+    "problem",      # 지금 문제 (make_problem 의 dict)
+    "solved",       # 맞힌 문제 수
+    "penalty",      # 페널티 합계(초)
+    "started_at",   # 시작 시각
+    "clicks",       # ((시작 후 ms, 칸, 결과, 곱하는 수), ...)
+    "finished_at",  # 다 풀었으면 끝난 시각, 아니면 None
+    "multipliers",  # 이 판에서 쓰는 곱하는 수 (덱이 떨어지면 여기서 다시 섞음)
+])
+
+
+def parse_range(text):
+    # "2-19" -> (2, 3, ..., 19), "1,2,5,10-12" -> (1, 2, 5, 10, 11, 12)
+    values = set()
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        low, sep, high = part.partition("-")
+        values.update(range(int(low), int(high) + 1) if sep else [int(low)])
+    if not values or min(values) < 1 or max(values) > MAX_NUMBER:
+        raise ValueError(f"범위는 1~{MAX_NUMBER} 사이의 숫자여야 합니다: {text!r}")
+    return tuple(sorted(values))
+
+
+def window_size(dan):
+    # 오답을 뽑는 연속 구간의 길이: 같은 단 이웃(정답 ± dan)이 자주 들어갈 만큼
+    return max(MIN_WINDOW, 2 * dan + 3)
+
+
+@functools.lru_cache(maxsize=None)
+def distractor_candidates(dan, multiplier):
+    # 판에 나올 수 있는 오답 전체 (정답 제외, 1 이상, 작은 수부터)
+    answer = dan * multiplier
+    size = window_size(dan)
+    return tuple(v for v in range(max(1, answer - size + 1), answer + size) if v != answer)
+
+
+def make_problem(dan, multiplier, rng=random, traps=1):
+    # 정답 1개 + 오답 8개를 섞은 판, 두더지는 정답 1마리 + 함정 traps 마리
+    # 오답: 정답이 들어 있는 길이 window_size 의 연속 구간을 정답 위치가 무작위가 되게 잡고,
+    # 그 구간의 나머지 숫자에서 중복 없이 뽑음. 그러면 9개 숫자 중 어느 것이 정답이어도 같은 확률이라
+    # 가운데 값이나 주변에 숫자가 몰린 값을 고르는 식으로는 답을 알 수 없음 (정답 ± 1, ± dan 같은 이웃도 자주 섞임)
+    # (확인: python tools/check_grid_uniformity.py)
+    answer = dan * multiplier
+    size = window_size(dan)
+    low = rng.randint(max(1, answer - size + 1), answer)  # 답이 아주 작으면 1 에서 잘림
+    # 정답을 뺀 size - 1 개 중에서 뽑고, 정답 이상인 값은 한 칸 밀어서 정답을 건너뜀
+    grid_numbers = [v if v < answer else v + 1 for v in rng.sample(range(low, low + size - 1), DISTRACTORS)]
+    grid_numbers.append(answer)
+    rng.shuffle(grid_numbers)
+
+    answer_idx = grid_numbers.index(answer)
+    indices = list(range(9))
+    indices.remove(answer_idx)
+    trap_indices = rng.sample(indices, traps)
+
+    return {
+        'problem': f"{dan} x {multiplier}",
+        'answer': answer,
+        'grid': grid_numbers,
+        'correct_mole_idx': answer_idx,
+        'wrong_mole_idx': trap_indices[0],
+        'trap_indices': trap_indices,
+        'multiplier': multiplier,
+    }
+
+
+def next_problem(dan, multiplier, rng=random, pool=None):
+    if pool is not None:
+        return pool.draw(dan, multiplier)
+    return make_problem(dan, multiplier, rng)
+
+
+def judge(problem, idx):
+    if idx == problem['correct_mole_idx']:
+        return CORRECT
+    if idx in problem['trap_indices']:
+        return TRAP
+    return EMPTY
+
+
+def new_deck(rng=random, multipliers=MULTIPLIERS):
+    deck = list(multipliers)
+    rng.shuffle(deck)
+    return tuple(deck)
+
+
+def start_round(dan, now, rng=random, pool=None, multipliers=MULTIPLIERS):
+    deck = new_deck(rng, multipliers)
+    return RoundState(dan, deck[1:], next_problem(dan, deck[0], rng, pool), 0, 0.0, now, (), None,
+                      tuple(multipliers))
+
+
+def click(state, idx, now, rng=random, pool=None):
+    # 칸 하나를 눌렀을 때: (새 상태, 결과). 이미 끝난 판이면 (그대로, None)
+    if state.finished_at is not None:
+        return state, None
+    problem = state.problem
+    outcome = judge(problem, idx)
+    clicks = state.clicks + ((max(0, int((now - state.started_at) * 1000)), idx, outcome, problem['multiplier']),)
+
+    if outcome != CORRECT:
+        return state._replace(penalty=state.penalty + PENALTY[outcome], clicks=clicks), outcome
+
+    solved = state.solved + 1
+    if solved >= TARGET_COUNT:
+        return state._replace(solved=solved, clicks=clicks, finished_at=now), outcome
+    deck = state.deck or new_deck(rng, state.multipliers)
+    return state._replace(deck=deck[1:], problem=next_problem(state.dan, deck[0], rng, pool),
+                          solved=solved, clicks=clicks), outcome
+
+
+def elapsed(state, now=None):
+    end = state.finished_at if state.finished_at is not None else now
+    return end - state.started_at
+
+
+def record(state):
+    # 최종 기록 = 걸린 시간 + 페널티
+    return elapsed(state) + state.penalty
+
+
+# 빠른 모드용: 한 판(9문제)을 미리 만들어 컴포넌트에 한 번에 넘김
+# 곱하는 수가 9개보다 적으면 덱을 이어 붙임
+def build_round_deck(dan, rng=random, pool=None, multipliers=MULTIPLIERS):
+    deck = ()
+    while len(deck) < TARGET_COUNT:
+        deck += new_deck(rng, multipliers)
+    return [next_problem(dan, m, rng, pool) for m in deck[:TARGET_COUNT]]
+
+
+# 브라우저가 보낸 클릭 기록 [[칸 번호, 시작 후 ms], ...] 을 덱에 맞춰 다시 채점
+# 올바르면 (기록, 페널티, 클릭 기록), 덱과 맞지 않거나 시간이 말이 안 되면 None
+def replay_round(deck, events, server_elapsed):
+    if not isinstance(events, list) or not events or len(events) > MAX_ROUND_EVENTS:
+        return None
+    solved = 0
+    penalty = 0.0
+    last_ms = 0
+    clicks = []
+    for event in events:
+        if solved >= len(deck):
+            return None  # 다 푼 뒤에 클릭이 더 있음
+        if not isinstance(event, list) or len(event) != 2:
+            return None
+        idx, t_ms = event
+        # json 은 true/false 를 bool(int 의 하위 클래스)로, NaN/Infinity 를 float 로 읽으므로 따로 막음
+        if isinstance(idx, bool) or not isinstance(idx, int) or not 0 <= idx < 9:
+            return None
+        if isinstance(t_ms, bool) or not isinstance(t_ms, (int, float)) or not math.isfinite(t_ms) or t_ms < last_ms:
+            return None
+        last_ms = t_ms
+        problem = deck[solved]
+        outcome = judge(problem, idx)
+        if outcome == CORRECT:
+            solved += 1
+        penalty += PENALTY[outcome]
+        clicks.append((t_ms, idx, outcome, problem['multiplier']))
+    if solved != len(deck):
+        return None
+
+    elapsed_s = last_ms / 1000
+    # 서버가 덱을 보낸 뒤 흐른 시간보다 길 수 없고, 너무 짧아도 안 됨
+    if elapsed_s > server_elapsed + 1.0 or elapsed_s < server_elapsed - CLIENT_TIME_SLACK:
+        return None
+    return elapsed_s + penalty, penalty, clicks
@@ -0,0 +1,208 @@
+# 럭키덕키 이미지 전처리 파이프라인
+# images/ 원본을 화면 표시 크기(1x, 2x)에 맞게 줄이고 PNG(JPG)/WebP/AVIF 로 다시 압축해 static/ 에 저장
+# 원본 내용 해시를 manifest.json 에 남겨 두고, 다음 실행(앱 시작) 때 바뀐 원본만 다시 만든다
+#
+#   $ python image_pipeline.py          # 수동 빌드
+#   $ python image_pipeline.py --force  # 전부 다시 빌드
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import sys
+
+IMG_DIR = "images"
+STATIC_DIR = "static"
+MANIFEST_FILE = os.path.join(STATIC_DIR, "manifest.json")
+SOURCE_EXTS = [".png", ".jpg", ".jpeg"]
+
+# 이미지 이름 -> 화면에 그려지는 높이(px). 버튼은 height: 100px, 시계는 160px
+DISPLAY_HEIGHTS = {
+    "mole": 100,
+    "hole": 100,
+    "duck_clock": 160,
+}
+SCALES = [1, 2]  # 2x = 레티나
+# 정적 서빙이 Content-Type 을 mimetypes 로 정하므로 최신 포맷을 등록해 둠
+mimetypes.add_type("image/webp", ".webp")
+mimetypes.add_type("image/avif", ".avif")
+
+MIME_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "webp": "image/webp",
+    "avif": "image/avif",
+}
+
+
+def file_hash(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def find_source(img_dir, name):
+    for ext in SOURCE_EXTS:
+        path = os.path.join(img_dir, name + ext)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def load_manifest(path=MANIFEST_FILE):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def is_fresh(entry, source_hash, out_dir):
+    if not entry or entry.get("source_hash") != source_hash:
+        return False
+    return all(os.path.exists(os.path.join(out_dir, v["file"])) for v in entry.get("variants", []))
+
+
+def encode(img, fmt):
+    # fmt 별 압축 설정. 지원하지 않는 포맷(AVIF 미지원 Pillow 등)은 None
+    buf = io.BytesIO()
+    try:
+        if fmt == "png":
+            img.save(buf, "PNG", optimize=True)
+        elif fmt == "jpg":
+            img.convert("RGB").save(buf, "JPEG", quality=82, optimize=True, progressive=True)
+        elif fmt == "webp":
+            img.save(buf, "WEBP", quality=80, method=6)
+        elif fmt == "avif":
+            img.save(buf, "AVIF", quality=60)
+    except (KeyError, OSError, ValueError):
+        return None
+    return buf.getvalue()
+
+
+def build_variants(name, source_path, height, out_dir):
+    from PIL import Image  # 빌드할 때만 필요
+
+    src_ext = os.path.splitext(source_path)[1].lower()
+    fallback = "png" if src_ext == ".png" else "jpg"
+    variants = []
+    with Image.open(source_path) as src:
+        src.load()
+        for scale in SCALES:
+            target_h = min(src.height, height * scale)
+            target_w = max(1, round(src.width * target_h / src.height))
+            resized = src.resize((target_w, target_h), Image.LANCZOS)
+            for fmt in [fallback, "webp", "avif"]:
+                data = encode(resized, fmt)
+                if data is None:
+                    continue
+                digest = file_hash(data)
+                file_name = f"{name}.{height}h@{scale}x.{digest}.{fmt}"
+                path = os.path.join(out_dir, file_name)
+                if not os.path.exists(path):
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp_path, path)
+                variants.append({
+                    "file": file_name, "format": fmt, "scale": scale,
+                    "width": target_w, "height": target_h,
+                    "bytes": len(data), "hash": digest,
+                })
+    return variants
+
+
+def build(img_dir=IMG_DIR, out_dir=STATIC_DIR, heights=None, force=False):
+    # 바뀐 원본만 다시 만들고 manifest 를 돌려줌
+    heights = heights or DISPLAY_HEIGHTS
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    manifest = load_manifest(manifest_path)
+    changed = False
+
+    for name, height in heights.items():
+        source_path = find_source(img_dir, name)
+        if source_path is None:
+            continue
+        with open(source_path, 'rb') as f:
+            source_hash = file_hash(f.read())
+        entry = manifest.get(name)
+        if not force and is_fresh(entry, source_hash, out_dir) and entry.get("display_height") == height:
+            continue
+
+        old_files = {v["file"] for v in (entry or {}).get("variants", [])}
+        variants = build_variants(name, source_path, height, out_dir)
+        manifest[name] = {
+            "source": os.path.basename(source_path),
+            "source_hash": source_hash,
+            "source_bytes": os.path.getsize(source_path),
+            "display_height": height,
+            "variants": variants,
+        }
+        # 이전 버전 파일 정리 (이미 열린 페이지는 잠깐 404 가 날 수 있지만 새로고침하면 해결)
+        for stale in old_files - {v["file"] for v in variants}:
+            try:
+                os.remove(os.path.join(out_dir, stale))
+            except OSError:
+                pass
+        changed = True
+
+    if changed:
+        save_manifest(manifest, manifest_path)
+    return manifest
+
+
+def pick_variants(manifest, name, display_height):
+    # 표시 높이에 맞는 변형을 배율(1x, 2x)별 / 포맷별로 골라줌
+    # 반환값: {포맷: {배율: 파일명}}. 정확히 맞는 높이가 없으면 가장 가까운 큰 것을 씀
+    entry = manifest.get(name)
+    if not entry:
+        return {}
+    picked = {}
+    for scale in SCALES:
+        want = display_height * scale
+        candidates = [v for v in entry["variants"] if v["scale"] == scale]
+        for fmt in {v["format"] for v in candidates}:
+            same_fmt = [v for v in candidates if v["format"] == fmt]
+            big_enough = [v for v in same_fmt if v["height"] >= want]
+            best = min(big_enough, key=lambda v: v["height"]) if big_enough else max(same_fmt, key=lambda v: v["height"])
+            picked.setdefault(fmt, {})[scale] = best["file"]
+    return picked
+
+
+def css_background(manifest, name, display_height, url_prefix="app/static/"):
+    # background-image 선언 2줄: 구형 브라우저용 url() + image-set() (WebP/AVIF, 1x/2x)
+    picked = pick_variants(manifest, name, display_height)
+    if not picked:
+        return None
+    entry = manifest[name]
+    fallback_fmt = "png" if entry["source"].lower().endswith(".png") else "jpg"
+    fallback = picked.get(fallback_fmt) or next(iter(picked.values()))
+
+    def url(file_name):
+        # 파일명에 해시가 들어 있음. streamlit 1.65 의 정적 서빙(Starlette)은 Cache-Control 을 붙이지 않으므로
+        # serve.py 의 ImmutableStaticCache 가 ?v= 가 붙은 요청에만 1년 immutable 캐시를 붙임
+        digest = file_name.split(".")[-2]
+        return f'url("{url_prefix}{file_name}?v={digest}")'
+
+    options = []
+    for fmt in ["avif", "webp", fallback_fmt]:
+        for scale, file_name in sorted(picked.get(fmt, {}).items()):
+            options.append(f'{url(file_name)} type("{MIME_TYPES[fmt]}") {scale}x')
+    return (
+        f"background-image: {url(fallback[1])} !important; "
+        f"background-image: image-set({', '.join(options)}) !important;"
+    )
+
+
+if __name__ == "__main__":
+    result = build(force="--force" in sys.argv)
+    for img_name, info in sorted(result.items()):
+        print(f"{img_name}: 원본 {info['source_bytes']:,} bytes")
+        for v in info["variants"]:
+            print(f"  {v['file']:<45} {v['width']}x{v['height']:<5} {v['bytes']:>9,} bytes")
@@ -0,0 +1,171 @@
+# 럭키덕키 명예의 전당 캐시
+# 단별 + 전체 상위 K 개 기록만 메모리에 들고 있다가, 저장이 끝나면 바로 갱신
+# 다른 프로세스가 랭킹 파일을 바꿨을 때(버전이 달라졌을 때)만 전체를 다시 읽음
+#
+# (이름, 단) 기록은 더 빨라지기만 하므로, 한 번 상위 K 에서 밀려난 기록이 다시 들어올 일이 없음
+# -> 크기 K 로 제한된 힙만으로도 정확한 상위 K 를 유지할 수 있음
+#
+# RankIndex 는 클리어 화면의 "몇 등인지"를 위한 정렬 배열 인덱스 (같은 방식으로 갱신/재구성)
+import bisect
+import heapq
+import threading
+
+from rank_store import dan_label
+
+ALL = None  # 전체 보기
+
+
+class TopK:
+    def __init__(self, k):
+        self.k = k
+        self._heap = []     # (-기록, 이름, 단, 날짜): 가장 느린 기록이 맨 앞
+        self._times = {}    # (이름, 단) -> 힙에 들어 있는 기록
+
+    def offer(self, name, label, record_time, date_str):
+        key = (name, label)
+        current = self._times.get(key)
+        if current is not None:
+            if record_time >= current:
+                return
+            # 이미 상위 K 안에 있는 사람이 기록을 줄인 경우: 해당 항목만 바꾸고 다시 힙으로 (O(K))
+            self._heap = [e for e in self._heap if (e[1], e[2]) != key]
+            heapq.heapify(self._heap)
+        elif len(self._heap) >= self.k and record_time >= -self._heap[0][0]:
+            return
+
+        heapq.heappush(self._heap, (-record_time, name, label, date_str))
+        self._times[key] = record_time
+        if len(self._heap) > self.k:
+            _, old_name, old_label, _ = heapq.heappop(self._heap)
+            del self._times[(old_name, old_label)]
+
+    def rows(self):
+        return [(name, label, -neg_time, date_str)
+                for neg_time, name, label, date_str in sorted(self._heap, reverse=True)]
+
+
+class Leaderboard:
+    def __init__(self, store, k=5):
+        self.store = store
+        self.k = k
+        self._lock = threading.Lock()
+        self._views = {}
+        self._version = object()  # 처음 top() 때 무조건 다시 읽도록
+
+    def _rebuild(self):
+        version = self.store.version()
+        views = {ALL: TopK(self.k)}
+        for name, label, record_time, date_str in self.store.rows():
+            views[ALL].offer(name, label, record_time, date_str)
+            views.setdefault(label, TopK(self.k)).offer(name, label, record_time, date_str)
+        self._views = views
+        self._version = version
+
+    def top(self, label=ALL):
+        # 파일 상태 확인(stat) 한 번 + K 개 정렬
+        with self._lock:
+            if self.store.version() != self._version:
+                self._rebuild()
+            view = self._views.get(label)
+            return view.rows() if view else []
+
+    def labels(self):
+        # 기록이 있는 단 이름 목록 (랭킹 필터용)
+        with self._lock:
+            if self.store.version() != self._version:
+                self._rebuild()
+            return [label for label in self._views if label is not ALL]
+
+    def apply(self, records, before=None, after=None):
+        # RankWriter 가 저장을 마친 직후 호출: 메모리만 갱신하고 저장 직후 버전(after)을 기억해 둠
+        # 캐시가 저장 직전 버전(before)을 보고 있을 때만. 아직 안 읽었거나 그 사이 다른 프로세스/서버가 쓴 경우에는
+        # 버전을 그대로 두어 다음 top() 에서 전체를 다시 읽음
+        # (여기서 version() 을 다시 읽으면 저장 뒤에 끼어든 다른 프로세스의 기록까지 본 것으로 치게 됨)
+        with self._lock:
+            if before is None or self._version != before:
+                return
+            for name, dan, record_time, date_str in records:
+                label = dan_label(dan)
+                record_time = round(record_time, 2)
+                self._views.setdefault(ALL, TopK(self.k)).offer(name, label, record_time, date_str)
+                self._views.setdefault(label, TopK(self.k)).offer(name, label, record_time, date_str)
+            self._version = after
+
+
+class RankIndex:
+    # 순위 계산용 인덱스: 단별/전체로 (이름, 단) 최고 기록들을 정렬된 배열로 들고 있음
+    # 순위 조회는 bisect 로 O(log N), 저장 반영은 이전 최고 기록을 빼고 새 기록을 끼워 넣음
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._best = {}      # (이름, 단) -> 최고 기록
+        self._times = {}     # 단 / ALL -> 정렬된 기록 목록
+        self._version = object()
+
+    def _rebuild(self):
+        version = self.store.version()
+        best = {}
+        for name, label, record_time, _ in self.store.rows():
+            key = (name, label)
+            if key not in best or record_time < best[key]:
+                best[key] = record_time
+        times = {ALL: sorted(best.values())}
+        for (_, label), record_time in best.items():
+            times.setdefault(label, []).append(record_time)
+        for label in times:
+            times[label].sort()
+        self._best = best
+        self._times = times
+        self._version = version
+
+    def _refresh(self):
+        if self.store.version() != self._version:
+            self._rebuild()
+
+    def _replace(self, label, old, new):
+        times = self._times.setdefault(label, [])
+        if old is not None:
+            del times[bisect.bisect_left(times, old)]
+        bisect.insort(times, new)
+
+    def apply(self, records, before=None, after=None):
+        # Leaderboard.apply 와 같은 규칙: 저장 직전 버전으로 만든 인덱스일 때만 바로 고치고,
+        # 아직 안 만들었거나 다른 곳의 저장을 놓쳤으면 그대로 두어 다음 rank_of 에서 다시 만듦
+        # 버전은 writer 가 저장 직후에 읽은 after 로 (여기서 다시 읽으면 그 사이 다른 프로세스의 저장을 놓침)
+        with self._lock:
+            if before is None or self._version != before:
+                return
+            for name, dan, record_time, _ in records:
+                key = (name, dan_label(dan))
+                record_time = round(record_time, 2)
+                old = self._best.get(key)
+                if old is not None and record_time >= old:
+                    continue  # 개인 최고 기록이 아니면 순위 변화 없음
+                self._best[key] = record_time
+                self._replace(key[1], old, record_time)
+                self._replace(ALL, old, record_time)
+            self._version = after
+
+    def rank_of(self, name, dan, record_time):
+        # 이 기록이 저장되었을 때의 순위. 아직 저장 중(write-behind)이어도 같은 답이 나옴
+        # 반환: {"best", "dan_rank", "dan_total", "all_rank", "all_total", "top_percent"}
+        label = dan_label(dan)
+        record_time = round(record_time, 2)
+        with self._lock:
+            self._refresh()
+            old = self._best.get((name, label))
+            best = record_time if old is None else min(old, record_time)
+            is_new = old is None
+            dan_times = self._times.get(label, [])
+            all_times = self._times.get(ALL, [])
+            # 나보다 빠른 기록 수 + 1 (같은 기록은 같은 순위). 내 이전 기록은 best 이상이라 세지 않음
+            dan_rank = bisect.bisect_left(dan_times, best) + 1
+            all_rank = bisect.bisect_left(all_times, best) + 1
+            dan_total = len(dan_times) + is_new
+            all_total = len(all_times) + is_new
+        return {
+            "best": best,
+            "dan_rank": dan_rank, "dan_total": dan_total,
+            "all_rank": all_rank, "all_total": all_total,
+            "top_percent": 100.0 * dan_rank / dan_total,
+        }
@@ -0,0 +1,137 @@
+# 럭키덕키 구간 시간 측정 (Prometheus 형식)
+# 리런 한 번의 시간이 어디에 쓰이는지 보려고 주요 구간(전역 CSS, 타이머, 두더지판, 랭킹 읽기/저장)을
+# perf_counter 로 재서 (구간, 페이지) 별 히스토그램에 모음
+#
+# METRICS=1 일 때만 켜짐. 꺼져 있으면 section() 은 미리 만들어 둔 빈 컨텍스트를 돌려줄 뿐이라 비용이 거의 없음
+# 켜져 있으면 METRICS_PORT(기본 9464) 의 /metrics 에서 Prometheus 텍스트 형식으로 읽을 수 있음 (127.0.0.1 전용)
+import contextlib
+import http.server
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("METRICS") == "1"
+PORT = int(os.environ.get("METRICS_PORT", "9464"))
+PREFIX = "luckyducky"
+# 히스토그램 칸 경계(초): 0.1 ms ~ 1 s
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_NOOP = contextlib.nullcontext()
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        i = 0
+        while i < len(BUCKETS) and seconds > BUCKETS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        # 칸 경계 기준 근사값 (해당 순위가 들어 있는 칸의 위쪽 경계)
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+        return float("inf")
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sections = {}  # (구간, 페이지) -> Histogram
+
+    def observe(self, section, page, seconds):
+        with self._lock:
+            hist = self._sections.get((section, page))
+            if hist is None:
+                hist = self._sections[(section, page)] = Histogram()
+            hist.observe(seconds)
+
+    def sections(self):
+        # [(구간, 페이지, 개수, 평균(초), p50, p95)] 구간 이름 순
+        with self._lock:
+            return [(section, page, h.count, h.sum / h.count, h.quantile(0.5), h.quantile(0.95))
+                    for (section, page), h in sorted(self._sections.items()) if h.count]
+
+    def render(self):
+        name = f"{PREFIX}_section_seconds"
+        lines = [f"# HELP {name} Time spent in a section of the Streamlit script, by page.",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for (section, page), h in sorted(self._sections.items()):
+                labels = f'section="{section}",page="{page}"'
+                cumulative = 0
+                for bound, c in zip(BUCKETS + ("+Inf",), h.counts):
+                    cumulative += c
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {h.sum:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class _Timer:
+    __slots__ = ("section", "page", "started")
+
+    def __init__(self, section, page):
+        self.section = section
+        self.page = page
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        REGISTRY.observe(self.section, self.page, time.perf_counter() - self.started)
+        return False
+
+
+def section(name, page):
+    # with metrics.section("grid", "playing"): ...
+    if not ENABLED:
+        return _NOOP
+    return _Timer(name, page)
+
+
+def observe(name, page, seconds):
+    if ENABLED:
+        REGISTRY.observe(name, page, seconds)
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass  # 스크레이프마다 로그를 남기지 않음
+
+
+def start_server(port=PORT, host="127.0.0.1"):
+    # 데몬 스레드에서 /metrics 서빙. 포트가 이미 쓰이고 있으면 (다른 프로세스가 열었으면) None
+    try:
+        server = http.server.ThreadingHTTPServer((host, port), _Handler)
+    except OSError:
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,121 @@
+# 럭키덕키 운영 현황판 (행사 때 서버 부하 보기)
+# 프로세스 전체 카운터: 페이지별 접속 중인 세션, 초당 리런, 리런당 HTML 바이트, 초당 기록 저장 / 저장 지연,
+# 이미지 캐시 적중률
+#
+# 카운터는 스레드마다 자기 dict 에만 더하므로 (threading.local) 리런 중에는 잠금이 없음
+# (streamlit 은 리런마다 스레드를 새로 만들 수 있으므로, 끝난 스레드의 값은 합칠 때 retired 로 옮기고 버림)
+# 샘플러 스레드가 1초마다 모든 스레드의 값을 합쳐 링 버퍼(최근 5분)에 넣고, 현황판은 버퍼만 읽음
+import collections
+import threading
+import time
+
+SAMPLE_SEC = 1.0
+HISTORY = 300          # 링 버퍼 크기 (샘플 수)
+ACTIVE_WINDOW = 60.0   # 마지막 리런이 이 시간 안이면 접속 중으로 봄 (창을 닫은 세션도 이 동안은 남음)
+
+
+class Counters:
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()   # 스레드 등록할 때만 씀
+        self._all = []                  # (스레드, 그 스레드의 카운터)
+        self._retired = collections.Counter()
+        self._sessions = {}             # 세션 키 -> (페이지, 마지막 리런 시각)
+
+    def _mine(self):
+        counts = getattr(self._local, "counts", None)
+        if counts is None:
+            counts = self._local.counts = collections.defaultdict(float)
+            with self._lock:
+                self._all.append((threading.current_thread(), counts))
+        return counts
+
+    def add(self, name, n=1):
+        self._mine()[name] += n
+
+    def touch(self, session_key, page):
+        self._sessions[session_key] = (page, time.monotonic())  # dict 값 하나 바꾸기는 GIL 아래에서 원자적
+
+    def totals(self):
+        with self._lock:
+            alive = []
+            for thread, counts in self._all:
+                if thread.is_alive():
+                    alive.append((thread, counts))
+                else:
+                    self._retired.update(counts)  # 끝난 스레드는 더 쓰지 않으므로 그대로 합침
+            self._all = alive
+            totals = collections.Counter(self._retired)
+        for _, counts in alive:
+            totals.update(counts.copy())
+        return totals
+
+    def active_sessions(self):
+        # 페이지 -> 세션 수. 오래된 세션은 여기서 지움
+        now = time.monotonic()
+        pages = collections.Counter()
+        for key, (page, seen) in list(self._sessions.items()):
+            if now - seen > ACTIVE_WINDOW:
+                self._sessions.pop(key, None)
+            else:
+                pages[page] += 1
+        return pages
+
+
+class Monitor:
+    # 샘플러: (시각, 누적 카운터, 페이지별 세션 수, 저장 통계) 를 링 버퍼에 쌓음
+    def __init__(self, counters, writer_stats=None, sample_sec=SAMPLE_SEC, history=HISTORY):
+        self.counters = counters
+        self.writer_stats = writer_stats
+        self.sample_sec = sample_sec
+        self.samples = collections.deque(maxlen=history)
+        self._thread = threading.Thread(target=self._run, name="ops-sampler", daemon=True)
+        self._thread.start()
+
+    def sample(self):
+        writer = self.writer_stats() if self.writer_stats else {}
+        self.samples.append((time.monotonic(), self.counters.totals(), self.counters.active_sessions(), writer))
+
+    def _run(self):
+        while True:
+            self.sample()
+            time.sleep(self.sample_sec)
+
+    def summary(self, window=10):
+        # 최근 window 개 샘플 사이의 변화로 초당 값 계산 (샘플이 모자라면 None)
+        samples = list(self.samples)
+        if len(samples) < 2:
+            return None
+        (t0, c0, _, w0), (t1, c1, pages, w1) = samples[max(0, len(samples) - 1 - window)], samples[-1]
+        seconds = t1 - t0
+        reruns = c1["rerun"] - c0["rerun"]
+        writes = w1.get("flushed", 0) - w0.get("flushed", 0)
+        image_calls = c1["image_call"] - c0["image_call"]
+        return {
+            "seconds": seconds,
+            "sessions": dict(pages),
+            "reruns_per_sec": reruns / seconds,
+            "html_bytes_per_rerun": (c1["html_bytes"] - c0["html_bytes"]) / reruns if reruns else 0.0,
+            "writes_per_sec": writes / seconds,
+            "write_latency_ms": (w1.get("total_latency_ms", 0) - w0.get("total_latency_ms", 0)) / writes if writes else None,
+            "write_queue": w1.get("queue_depth", 0),
+            "write_failed": w1.get("failed", 0),   # 저장을 포기하고 저널에 남긴 기록 수
+            "write_error": w1.get("last_error"),
+            "image_hit_rate": 1 - (c1["image_miss"] - c0["image_miss"]) / image_calls if image_calls else None,
+            # 전체 누적 (서버 시작 후)
+            "total_reruns": int(c1["rerun"]),
+            "total_image_hit_rate": 1 - c1["image_miss"] / c1["image_call"] if c1["image_call"] else None,
+        }
+
+    def series(self):
+        # 차트용: 샘플 간 초당 리런 / 초당 저장
+        samples = list(self.samples)
+        rows = []
+        for (t0, c0, _, w0), (t1, c1, pages, w1) in zip(samples, samples[1:]):
+            dt = t1 - t0
+            rows.append((round(t1 - samples[-1][0], 1), (c1["rerun"] - c0["rerun"]) / dt,
+                         (w1.get("flushed", 0) - w0.get("flushed", 0)) / dt, sum(pages.values())))
+        return rows
+
+
+COUNTERS = Counters()
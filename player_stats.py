@@ -0,0 +1,125 @@
+# 럭키덕키 도전 기록 / 플레이어 통계
+# 랭킹에는 (이름, 단) 최고 기록만 남지만, 여기에는 모든 도전을 남김
+#   - rank/attempts.csv : 도전 한 번마다 한 줄씩 덧붙이기만 하는 로그 (이름, 단, 기록(초), 날짜)
+#   - rank/players.db   : 플레이어별 누적값 (도전 횟수, 합계, 최고, 연속 도전 일수, 단별 횟수/최고)
+# 누적값은 도전 하나당 행 하나만 읽고 고치므로(O(1)) 로그가 아무리 길어져도 프로필은 바로 나옴
+# RankWriter 리스너로 붙어 저장 스레드에서 돌기 때문에 finish_game 을 기다리게 하지 않음
+import csv
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+from rank_store import dan_label
+
+ATTEMPT_HEADER = ["이름", "단", "기록(초)", "날짜"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    name        TEXT PRIMARY KEY,
+    attempts    INTEGER NOT NULL,
+    total_time  REAL NOT NULL,
+    best        REAL NOT NULL,
+    last_date   TEXT NOT NULL,
+    streak      INTEGER NOT NULL,
+    best_streak INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_dans (
+    name     TEXT NOT NULL,
+    dan      TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    best     REAL NOT NULL,
+    PRIMARY KEY (name, dan)
+);
+"""
+
+
+def next_streak(last_date, streak, date_str):
+    # 같은 날 또 하면 그대로, 바로 다음 날이면 +1, 하루라도 쉬면 1부터 다시
+    if last_date == date_str:
+        return streak
+    try:
+        if date.fromisoformat(last_date) + timedelta(days=1) == date.fromisoformat(date_str):
+            return streak + 1
+    except ValueError:
+        pass
+    return 1
+
+
+class PlayerStats:
+    def __init__(self, rank_dir):
+        self.log_path = os.path.join(rank_dir, "attempts.csv")
+        self.db_path = os.path.join(rank_dir, "players.db")
+        self._local = threading.local()
+        if not os.path.exists(self.log_path):
+            with open(self.log_path, mode='w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(ATTEMPT_HEADER)
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def apply(self, records, before=None, after=None):
+        # RankWriter 리스너: 묶음 하나를 로그에 덧붙이고 누적값을 한 트랜잭션으로 갱신 (저장소 버전은 쓰지 않음)
+        rows = [(name, dan_label(dan), round(record_time, 2), date_str)
+                for name, dan, record_time, date_str in records]
+        with open(self.log_path, mode='a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows([[n, d, f"{t:.2f}", day] for n, d, t, day in rows])
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for name, label, record_time, date_str in rows:
+                current = conn.execute(
+                    "SELECT attempts, total_time, best, last_date, streak, best_streak FROM players WHERE name = ?",
+                    (name,)).fetchone()
+                if current is None:
+                    conn.execute("INSERT INTO players VALUES (?, 1, ?, ?, ?, 1, 1)",
+                                 (name, record_time, record_time, date_str))
+                else:
+                    attempts, total_time, best, last_date, streak, best_streak = current
+                    streak = next_streak(last_date, streak, date_str)
+                    conn.execute(
+                        "UPDATE players SET attempts = ?, total_time = ?, best = ?, last_date = ?, streak = ?, "
+                        "best_streak = ? WHERE name = ?",
+                        (attempts + 1, total_time + record_time, min(best, record_time),
+                         max(last_date, date_str), streak, max(best_streak, streak), name))
+                conn.execute(
+                    "INSERT INTO player_dans VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (name, dan) DO UPDATE SET attempts = attempts + 1, best = min(best, excluded.best)",
+                    (name, label, record_time))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def profile(self, name):
+        # 누적값만 읽음 (로그는 보지 않음). 기록이 없으면 None
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT attempts, total_time, best, last_date, streak, best_streak FROM players WHERE name = ?",
+            (name,)).fetchone()
+        if row is None:
+            return None
+        attempts, total_time, best, last_date, streak, best_streak = row
+        dans = conn.execute(
+            "SELECT dan, attempts, best FROM player_dans WHERE name = ? ORDER BY CAST(dan AS INTEGER)",
+            (name,)).fetchall()
+        # 어제 이후로 안 했으면 연속 기록은 끊긴 것
+        if last_date < (date.today() - timedelta(days=1)).isoformat():
+            streak = 0
+        return {
+            "attempts": attempts,
+            "mean": total_time / attempts,
+            "best": best,
+            "last_date": last_date,
+            "streak": streak,
+            "best_streak": best_streak,
+            "dans": dans,
+        }
@@ -0,0 +1,69 @@
+# 럭키덕키 문제판 미리 만들어 두기
+# 정답을 맞힐 때마다 make_problem 으로 9칸 판을 새로 만들던 것을, (단, 곱하는 수) 마다 미리 만든 판을 큐에 쌓아 두고 꺼내 씀
+#   draw()  : 큐 앞에서 하나 꺼냄 (O(1)). 큐가 비어 있으면 그 자리에서 make_problem (결과는 같음)
+#   채우기  : 백그라운드 스레드 하나가 size 개 아래로 내려간 큐를 다시 채움
+# 큐는 처음 꺼낼 때 만듦 (DAN_RANGE/MULTIPLIER_RANGE 를 넓히면 조합이 수만 개라 전부 미리 채울 수 없음)
+# 만들 때 dans x multipliers 만 미리 채워 둠 (앱은 기본 범위만)
+# 판은 한 번 꺼내면 다시 쓰지 않으므로, 미리 만들어도 make_problem 을 그때그때 부르는 것과 분포가 같음
+# (확인: python tools/check_grid_uniformity.py)
+#
+# 앱에서는 st.cache_resource 로 프로세스에 하나만 두고 모든 세션이 같이 씀
+import collections
+import random
+import threading
+
+import game_core
+
+POOL_SIZE = 32  # (단, 곱하는 수) 마다 쌓아 두는 판 수
+LOW_WATER = 8   # 이보다 적어지면 채우기 스레드를 깨움
+
+
+class GridPool:
+    def __init__(self, dans=game_core.DANS, multipliers=game_core.MULTIPLIERS, traps=1,
+                 size=POOL_SIZE, low=LOW_WATER, background=True):
+        self.traps = traps
+        self.size = size
+        self.low = low
+        self._pools = {(dan, m): collections.deque() for dan in dans for m in multipliers}  # 미리 채울 조합
+        self._rng = random.Random()  # 채우기 스레드 전용
+        self._wake = threading.Event()
+        # 통계 (여러 스레드가 더하므로 대략적인 값)
+        self.drawn = 0
+        self.misses = 0
+        if background:
+            threading.Thread(target=self._run, name="grid-pool", daemon=True).start()
+            self._wake.set()  # 처음 채우기도 뒤에서 (그동안의 draw 는 그 자리에서 만듦)
+
+    def draw(self, dan, multiplier):
+        pool = self._pools.get((dan, multiplier))
+        if pool is None:
+            pool = self._pools.setdefault((dan, multiplier), collections.deque())  # 처음 꺼내는 조합: 큐를 만들고 뒤에서 채움
+        self.drawn += 1
+        try:
+            problem = pool.popleft()  # deque 의 popleft/append 는 스레드 안전
+        except IndexError:
+            self.misses += 1
+            problem = game_core.make_problem(dan, multiplier, traps=self.traps)
+        if len(pool) < self.low:
+            self._wake.set()
+        return problem
+
+    def fill(self):
+        # 지금까지 만든 큐(미리 채울 조합 + 한 번이라도 꺼낸 조합)를 size 개까지 채움. 새로 만든 판 수를 돌려줌
+        added = 0
+        for (dan, multiplier), pool in list(self._pools.items()):
+            while len(pool) < self.size:
+                pool.append(game_core.make_problem(dan, multiplier, self._rng, self.traps))
+                added += 1
+        return added
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            self.fill()
+
+    def stats(self):
+        return {"drawn": self.drawn, "misses": self.misses,
+                "hit_rate": 1 - self.misses / self.drawn if self.drawn else None,
+                "pooled": sum(len(p) for p in self._pools.values())}
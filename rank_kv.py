@@ -0,0 +1,288 @@
+# 럭키덕키 랭킹 서버 (네트워크 key-value 백엔드)
+# 앱 서버(replica) 여러 대가 랭킹 하나를 같이 쓰도록, (이름, 단) -> (기록, 날짜) 를 들고 있는 작은 TCP 서버
+# 앱 쪽에서는 RANK_BACKEND=kv, RANK_KV_ADDR=host:port 로 KvRankStore 를 씀 (rank_store.RankStore 인터페이스)
+#
+# 프로토콜: 요청/응답 모두 [4바이트 길이(big endian)][UTF-8 JSON 배열] 한 프레임
+#   요청 ["UPSERT", 이름, "7단", 기록, 날짜]      -> ["ok", 1(바뀜) / 0(기존 기록이 더 좋음)]
+#        ["SYNC"]                                 -> ["ok", null]   (저장 로그 fsync)
+#        ["SCAN"] / ["TOP", 단, limit] / ["PAGE", 단, after, limit, 시작일, 끝일, 이름 앞부분]
+#        ["VERSION"]                              -> ["ok", [서버 id, 변경 번호]]
+#   오류는 ["err", 메시지]
+# 한 연결의 응답은 요청 순서대로 오므로, 클라이언트는 요청 여러 개를 한 번에 보내고 응답을 나중에 모아 읽음 (pipelining)
+#
+# 서버는 메모리 dict 가 원본이고, --data 를 주면 바뀐 기록을 JSON 한 줄씩 덧붙여 두었다가 다시 켤 때 재실행함
+# (시작할 때 현재 상태만 남도록 로그를 다시 씀)
+#
+#   $ python rank_kv.py serve --port 7411 --data rank/kv.jsonl
+import argparse
+import json
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import uuid
+
+import rank_store
+
+DEFAULT_ADDR = "127.0.0.1:7411"
+FRAME = struct.Struct(">I")
+MAX_FRAME = 64 * 1024 * 1024
+PIPELINE = 256  # 한 번에 보내는 UPSERT 수 (응답이 소켓 버퍼를 넘치지 않을 만큼)
+
+
+def encode(message):
+    body = json.dumps(message, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return FRAME.pack(len(body)) + body
+
+
+def read_frame(rfile):
+    # 연결이 닫혔으면 None
+    header = rfile.read(FRAME.size)
+    if len(header) < FRAME.size:
+        return None
+    (size,) = FRAME.unpack(header)
+    if size > MAX_FRAME:
+        raise ValueError(f"프레임이 너무 큼: {size}")
+    body = rfile.read(size)
+    if len(body) < size:
+        return None
+    return json.loads(body)
+
+
+def parse_addr(address):
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class RankTable:
+    # 서버 쪽 저장: (이름, 단) -> (기록, 날짜), 더 빠른 기록만 반영
+    def __init__(self, path=None):
+        self._lock = threading.Lock()
+        self._best = {}
+        self.server_id = uuid.uuid4().hex[:8]  # 서버가 다시 켜지면 version 이 반드시 달라지도록
+        self.seq = 0
+        self._log = None
+        if path is not None:
+            self._load(path)
+
+    def _load(self, path):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory): os.makedirs(directory)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        name, label, record_time, date_str = json.loads(line)
+                    except ValueError:
+                        continue  # 쓰다 만 마지막 줄
+                    self.upsert(name, label, record_time, date_str)
+        # 같은 키를 여러 번 고친 줄은 버리고 현재 상태만 남김
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding='utf-8') as f:
+            for row in self.rows():
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        self._log = open(path, "a", encoding='utf-8')
+
+    def upsert(self, name, label, record_time, date_str):
+        key = (name, label)
+        record_time = round(float(record_time), 2)
+        with self._lock:
+            saved = self._best.get(key)
+            if saved is not None and saved[0] <= record_time:
+                return 0
+            self._best[key] = (record_time, date_str)
+            self.seq += 1
+            if self._log is not None:
+                self._log.write(json.dumps([name, label, record_time, date_str], ensure_ascii=False) + "\n")
+                self._log.flush()
+        return 1
+
+    def sync(self):
+        with self._lock:
+            if self._log is not None:
+                os.fsync(self._log.fileno())
+
+    def rows(self):
+        with self._lock:
+            return [(name, label, t, d) for (name, label), (t, d) in self._best.items()]
+
+    def version(self):
+        return [self.server_id, self.seq]
+
+    def execute(self, request):
+        command, args = request[0], request[1:]
+        if command == "UPSERT":
+            return self.upsert(*args)
+        if command == "SYNC":
+            return self.sync()
+        if command == "SCAN":
+            return self.rows()
+        if command == "TOP":
+            label, limit = args
+            return sorted((r for r in self.rows() if label is None or r[1] == label), key=lambda r: r[2])[:limit]
+        if command == "PAGE":
+            # 정렬된 인덱스가 없어 요청마다 전체를 정렬함 (보내는 건 limit 개뿐)
+            return rank_store.page_rows(self.rows(), *args)
+        if command == "VERSION":
+            return self.version()
+        if command == "PING":
+            return "pong"
+        raise ValueError(f"알 수 없는 명령: {command}")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self):
+        table = self.server.table
+        while True:
+            try:
+                request = read_frame(self.rfile)
+            except ValueError:
+                return  # 잘못된 프레임: 연결을 끊음
+            if request is None:
+                return
+            try:
+                reply = ["ok", table.execute(request)]
+            except Exception as e:
+                reply = ["err", repr(e)]
+            self.wfile.write(encode(reply))
+
+
+class RankServer(socketserver.ThreadingTCPServer):
+    # 연결마다 스레드 하나. 연결은 클라이언트 풀에서 오래 재사용되므로 스레드 수 = 전체 풀 크기 합
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, table):
+        self.table = table
+        super().__init__(address, _Handler)
+
+
+def start_server(host="127.0.0.1", port=0, path=None):
+    # 같은 프로세스 안에서 띄우는 랭킹 서버 (테스트 / 도구용). port=0 이면 빈 포트를 골라 server.server_address 에 둠
+    server = RankServer((host, port), RankTable(path))
+    threading.Thread(target=server.serve_forever, name="rank-kv", daemon=True).start()
+    return server
+
+
+class _Connection:
+    def __init__(self, address, timeout):
+        self.sock = socket.create_connection(address, timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rfile = self.sock.makefile("rb")
+
+    def call(self, requests):
+        # 요청을 한 번에 보내고 응답을 순서대로 모음
+        self.sock.sendall(b"".join(encode(r) for r in requests))
+        results = []
+        for _ in requests:
+            reply = read_frame(self.rfile)
+            if reply is None:
+                raise ConnectionError("랭킹 서버 연결이 끊김")
+            results.append(reply)
+        return results
+
+    def close(self):
+        self.rfile.close()
+        self.sock.close()
+
+
+class KvRankStore(rank_store.RankStore):
+    # 랭킹 서버 클라이언트. 연결은 최대 pool_size 개까지 만들어 두고 스레드끼리 돌려 씀
+    # (리런 스레드들은 version/top/page, writer 스레드는 save_many)
+    # 연결이 끊기면 새 연결로 한 번 더 보냄: UPSERT 는 최소값 규칙이라 두 번 가도 결과가 같음
+    def __init__(self, address=DEFAULT_ADDR, pool_size=8, timeout=5.0, fsync=True):
+        self.address = parse_addr(address) if isinstance(address, str) else tuple(address)
+        self.timeout = timeout
+        self.fsync = fsync
+        self._idle = queue.LifoQueue()  # 가장 최근에 쓴 연결부터 (오래 안 쓴 연결은 서버가 닫았을 수 있음)
+        self._slots = threading.BoundedSemaphore(pool_size)
+
+    def _call(self, requests):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError("랭킹 서버 연결 풀이 비지 않음")
+        try:
+            for attempt in range(2):
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = _Connection(self.address, self.timeout)
+                try:
+                    replies = conn.call(requests)
+                except (OSError, ValueError):
+                    conn.close()
+                    if attempt:
+                        raise
+                    continue
+                self._idle.put(conn)
+                break
+        finally:
+            self._slots.release()
+        results = []
+        for status, value in replies:
+            if status != "ok":
+                raise rank_store.RankStoreError(f"랭킹 서버 오류: {value}")
+            results.append(value)
+        return results
+
+    def call(self, *request):
+        return self._call([list(request)])[0]
+
+    def save(self, name, dan, record_time):
+        self.save_many([(name, dan, record_time, rank_store.today())])
+
+    def save_many(self, records):
+        # UPSERT 를 PIPELINE 개씩 한 번에 보냄 (왕복 한 번), 마지막에 SYNC 로 서버 로그 fsync
+        requests = [["UPSERT", name, rank_store.dan_label(dan), round(record_time, 2), date_str]
+                    for name, dan, record_time, date_str in records]
+        if self.fsync:
+            requests.append(["SYNC"])
+        for i in range(0, len(requests), PIPELINE):
+            self._call(requests[i:i + PIPELINE])
+
+    def rows(self):
+        return [tuple(r) for r in self.call("SCAN")]
+
+    def version(self):
+        return tuple(self.call("VERSION"))
+
+    def top(self, label=None, limit=5):
+        return [tuple(r) for r in self.call("TOP", label, limit)]
+
+    def page(self, label=None, after=None, limit=20, date_from=None, date_to=None, name_prefix=None):
+        after = list(after) if after is not None else None
+        return [tuple(r) for r in self.call("PAGE", label, after, limit, date_from, date_to, name_prefix)]
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=parse_addr(DEFAULT_ADDR)[1])
+    parser.add_argument("--data", help="저장 로그 파일 (없으면 메모리에만 둠)")
+    args = parser.parse_args()
+    server = RankServer((args.host, args.port), RankTable(args.data))
+    print(f"랭킹 서버 {args.host}:{args.port} (기록 {len(server.table.rows())}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
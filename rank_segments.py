@@ -0,0 +1,255 @@
+# 럭키덕키 랭킹 저장소: 날짜별 세그먼트 + 요약 (RANK_BACKEND=segments)
+# ranking_speed.csv 하나가 끝없이 커지고 저장할 때마다 전체를 다시 쓰던 것을 나눔
+#
+#   rank/segments/ranking-2026-10-18.csv   저장된 기록을 그 날짜(또는 주) 파일 끝에 덧붙이기만 함 (원본 기록)
+#   rank/segments/summary-2026-10-17.csv   2026-10-17 구간까지 접어 넣은 (이름, 단) 최고 기록 (단, 기록 순)
+#
+# 읽기 = 요약 + 아직 접지 않은 세그먼트(보통 오늘 것 하나). 요약은 파일 이름이 바뀔 때만 다시 읽고,
+# 세그먼트는 지난번에 읽은 위치부터 새로 붙은 줄만 읽음
+# 압축기(compactor)는 끝난 구간(오늘 이전) 세그먼트를 요약에 접어 넣고 새 요약 파일로 바꿈
+# 보관 기간(retention_days)이 지난 세그먼트는 요약에 들어간 뒤에 지움 (최고 기록은 요약에 남음)
+# (이름, 단) 최소값 규칙이라 같은 기록이 요약과 세그먼트에 둘 다 있어도 결과가 같음
+# top/page 는 RankStore 기본 구현 (요약 + 세그먼트 전체를 정렬해서 자름)
+#
+#   $ python rank_segments.py compact [rank 폴더]
+import csv
+import glob
+import os
+import sys
+import threading
+from datetime import date, datetime, timedelta
+
+import rank_store
+
+PARTITIONS = ["day", "week"]
+COMPACT_SEC = 600.0
+
+
+def period_of(date_str, partition):
+    # "2026-10-18" -> "2026-10-18" (day) / "2026-W42" (week). 문자열 순서 = 시간 순서
+    if partition == "day":
+        return date_str
+    year, week, _ = datetime.strptime(date_str, "%Y-%m-%d").isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def period_end(period):
+    # 구간의 마지막 날
+    if "-W" in period:
+        year, week = period.split("-W")
+        return date.fromisocalendar(int(year), int(week), 7)
+    return date.fromisoformat(period)
+
+
+class SegmentedRankStore(rank_store.RankStore):
+    def __init__(self, seg_dir, partition="day", retention_days=None, import_from=None, fsync=True):
+        if partition not in PARTITIONS:
+            raise ValueError(f"알 수 없는 세그먼트 단위: {partition}")
+        self.seg_dir = seg_dir
+        self.partition = partition
+        self.retention_days = retention_days  # None 이면 원본 세그먼트를 지우지 않음
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._lock_path = os.path.join(seg_dir, "segments")  # 프로세스 간 잠금 (file_lock 이 .lock 을 붙임)
+        self._summary_name = None
+        self._summary = {}      # 요약: (이름, 단) -> (기록, 날짜)
+        self._tails = {}        # 세그먼트 이름 -> [읽은 위치, {(이름, 단): (기록, 날짜)}]
+        self._compactor = None
+        if not os.path.exists(seg_dir): os.makedirs(seg_dir)
+        # 처음 만드는 세그먼트 폴더라면 기존 CSV 기록을 첫 요약으로 가져옴
+        if import_from and os.path.exists(import_from) and not self._files("summary-*.csv") \
+                and not self._files("ranking-*.csv"):
+            best = {}
+            fold(best, rank_store.iter_csv_rows(import_from))
+            with rank_store.file_lock(self._lock_path):
+                self._write_summary(best, "0000", None)
+
+    def _files(self, pattern):
+        return sorted(os.path.basename(p) for p in glob.glob(os.path.join(self.seg_dir, pattern)))
+
+    def _summary_file(self):
+        names = self._files("summary-*.csv")
+        return names[-1] if names else None
+
+    @staticmethod
+    def _through(summary_name):
+        # summary-2026-10-17.csv -> "2026-10-17" (요약에 들어간 마지막 구간)
+        return summary_name[len("summary-"):-len(".csv")] if summary_name else ""
+
+    def _open_segments(self, through):
+        # 아직 요약에 안 들어간 세그먼트 이름
+        return [n for n in self._files("ranking-*.csv") if n[len("ranking-"):-len(".csv")] > through]
+
+    def _segment_for(self, date_str, through, current):
+        period = period_of(date_str, self.partition)
+        # 이미 접힌 구간 날짜의 기록(저널 재실행 등)은 지금 구간 세그먼트에 넣어야 읽힘
+        return f"ranking-{current if period <= through else period}.csv"
+
+    def save_many(self, records):
+        rows = {}
+        for name, dan, record_time, date_str in records:
+            rows.setdefault(date_str, []).append([name, rank_store.dan_label(dan), f"{record_time:.2f}", date_str])
+        current = period_of(rank_store.today(), self.partition)
+        with self._lock, rank_store.file_lock(self._lock_path):
+            through = self._through(self._summary_file())
+            by_segment = {}
+            for date_str, segment_rows in rows.items():
+                by_segment.setdefault(self._segment_for(date_str, through, current), []).extend(segment_rows)
+            for name, segment_rows in by_segment.items():
+                path = os.path.join(self.seg_dir, name)
+                is_new = not os.path.exists(path)
+                with open(path, mode='a', newline='', encoding='utf-8') as f:
+                    writer = csv.writer(f)
+                    if is_new:
+                        writer.writerow(rank_store.HEADER)
+                    writer.writerows(segment_rows)
+                    f.flush()
+                    if self.fsync:
+                        os.fsync(f.fileno())
+
+    def _read_tail(self, name):
+        # 세그먼트는 덧붙이기만 하므로 지난번 위치부터 새 줄만 읽음
+        tail = self._tails.setdefault(name, [0, {}])
+        path = os.path.join(self.seg_dir, name)
+        with open(path, mode='rb') as f:
+            f.seek(tail[0])
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # 쓰는 중인 마지막 줄 조각은 다음에
+        if end:
+            lines = data[:end].decode('utf-8').splitlines()
+            if tail[0] == 0:
+                lines = lines[1:]  # 머리줄
+            fold(tail[1], parse_rows(lines))
+            tail[0] += end
+        return tail[1]
+
+    def rows(self):
+        with self._lock, rank_store.file_lock(self._lock_path):
+            summary_name = self._summary_file()
+            if summary_name != self._summary_name:
+                self._summary = {}
+                if summary_name:
+                    fold(self._summary, rank_store.iter_csv_rows(os.path.join(self.seg_dir, summary_name)))
+                self._summary_name = summary_name
+            open_segments = self._open_segments(self._through(summary_name))
+            for name in list(self._tails):
+                if name not in open_segments:
+                    del self._tails[name]  # 요약에 들어갔거나 지워진 세그먼트
+            best = dict(self._summary)
+            for name in open_segments:
+                for key, value in self._read_tail(name).items():
+                    saved = best.get(key)
+                    if saved is None or value < saved:
+                        best[key] = value
+        return [(name, label, t, d) for (name, label), (t, d) in best.items()]
+
+    def version(self):
+        # 요약 파일 이름 + 열린 세그먼트들의 크기 (덧붙이면 크기가, 압축하면 요약 이름이 바뀜)
+        # 리런마다 불리므로 폴더는 한 번만 훑고, stat 은 열린 세그먼트(보통 하나)만
+        summaries, segments = [], []
+        with os.scandir(self.seg_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".csv"):
+                    if entry.name.startswith("summary-"):
+                        summaries.append(entry.name)
+                    elif entry.name.startswith("ranking-"):
+                        segments.append(entry)
+        summary_name = max(summaries) if summaries else None
+        through = self._through(summary_name)
+        result = [summary_name]
+        for entry in sorted(segments, key=lambda e: e.name):
+            if entry.name[len("ranking-"):-len(".csv")] > through:
+                try:
+                    result.append((entry.name, entry.stat().st_size))
+                except OSError:
+                    pass
+        return tuple(result)
+
+    def _write_summary(self, best, through, old_name):
+        # 새 요약을 다 쓴 뒤 옛 요약을 지움 (읽는 쪽은 잠금 안에서 가장 최근 요약 하나만 봄)
+        rows = sorted(((name, label, t, d) for (name, label), (t, d) in best.items()),
+                      key=lambda r: (r[1], r[2], r[0]))
+        rank_store.atomic_write_rows(os.path.join(self.seg_dir, f"summary-{through}.csv"),
+                                     [rank_store.HEADER] + [[n, lb, f"{t:.2f}", d] for n, lb, t, d in rows], self.fsync)
+        if old_name and old_name != f"summary-{through}.csv":
+            os.remove(os.path.join(self.seg_dir, old_name))
+
+    def compact(self, today_str=None):
+        # 끝난 구간 세그먼트를 요약에 접어 넣고, 보관 기간이 지난 세그먼트를 지움
+        # 돌려주는 값: (접은 세그먼트 수, 지운 세그먼트 수)
+        today_str = today_str or rank_store.today()
+        current = period_of(today_str, self.partition)
+        with self._lock, rank_store.file_lock(self._lock_path):
+            summary_name = self._summary_file()
+            through = self._through(summary_name)
+            closed = [n for n in self._open_segments(through) if n[len("ranking-"):-len(".csv")] < current]
+            if closed:
+                best = {}
+                if summary_name:
+                    fold(best, rank_store.iter_csv_rows(os.path.join(self.seg_dir, summary_name)))
+                for name in closed:
+                    fold(best, rank_store.iter_csv_rows(os.path.join(self.seg_dir, name)))
+                through = closed[-1][len("ranking-"):-len(".csv")]
+                self._write_summary(best, through, summary_name)
+            pruned = 0
+            if self.retention_days is not None:
+                cutoff = date.fromisoformat(today_str) - timedelta(days=self.retention_days)
+                for name in self._files("ranking-*.csv"):
+                    period = name[len("ranking-"):-len(".csv")]
+                    if period <= through and period_end(period) < cutoff:
+                        os.remove(os.path.join(self.seg_dir, name))
+                        pruned += 1
+        return len(closed), pruned
+
+    def start_compactor(self, interval=COMPACT_SEC):
+        # 데몬 스레드에서 interval 마다 compact (서버가 여러 대여도 파일 잠금으로 한 번에 하나씩)
+        if self._compactor is not None:
+            return
+        stop = threading.Event()
+
+        def run():
+            while True:
+                try:
+                    self.compact()
+                except OSError:
+                    pass  # 다음 주기에 다시
+                if stop.wait(interval):
+                    return
+
+        self._compactor = stop
+        threading.Thread(target=run, name="rank-compactor", daemon=True).start()
+
+    def close(self):
+        if self._compactor is not None:
+            self._compactor.set()
+            self._compactor = None
+
+
+def parse_rows(lines):
+    for row in csv.reader(lines):
+        if len(row) < 4: continue
+        try:
+            yield (row[0], row[1], float(row[2]), row[3])
+        except ValueError:
+            continue
+
+
+def fold(best, rows):
+    # (이름, 단) -> (기록, 날짜) 최소값으로 합침 (같은 기록이면 이른 날짜)
+    for name, label, record_time, date_str in rows:
+        key = (name, label)
+        value = (record_time, date_str)
+        saved = best.get(key)
+        if saved is None or value < saved:
+            best[key] = value
+    return best
+
+
+if __name__ == "__main__":
+    if len(sys.argv) in (2, 3) and sys.argv[1] == "compact":
+        store = rank_store.open_store("segments", sys.argv[2] if len(sys.argv) == 3 else "rank")
+        folded, pruned = store.compact()
+        print(f"세그먼트 {folded}개를 요약에 넣고, {pruned}개를 지웠습니다.")
+    else:
+        print("사용법: python rank_segments.py compact [rank 폴더]")
+        sys.exit(1)
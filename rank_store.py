@@ -0,0 +1,599 @@
+# 럭키덕키 랭킹 저장소
+# (이름, 단) 마다 최고 기록 하나만 남기는 규칙은 백엔드와 상관없이 같음
+#   - CsvRankStore   : rank/ranking_speed.csv (기존 방식, 저장할 때마다 파일 전체를 다시 씀)
+#   - SqliteRankStore: rank/ranking.db (WAL, (이름, 단) 유니크 인덱스 + 최소값 upsert)
+#   - KvRankStore    : rank_kv.py 의 랭킹 서버 (TCP). 서버 여러 대가 랭킹 하나를 같이 쓸 때
+#   - SegmentedRankStore: rank_segments.py, rank/segments/ 의 날짜별 세그먼트 + (이름, 단) 최고 기록 요약
+# 순위 페이지(page)를 인덱스에서 limit 개만 읽는 건 SQLite 뿐. 나머지는 매번 전체를 정렬해서 자름 (기록이 많으면 sqlite 로)
+# 모든 백엔드가 RankStore 인터페이스를 따르므로 RankWriter / Leaderboard / 분석은 백엔드를 모름
+#
+#   $ python rank_store.py import rank/ranking_speed.csv rank/ranking.db   # CSV -> SQLite 한 번에 옮기기
+import atexit
+import csv
+import glob
+import json
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import fcntl  # 유닉스 전용. 윈도우에서는 프로세스 간 잠금 없이 동작
+except ImportError:
+    fcntl = None
+
+HEADER = ["이름", "단", "기록(초)", "날짜"]
+
+
+def dan_label(dan):
+    # 7 -> "7단" ("7단" 처럼 이미 붙어 있으면 그대로)
+    return dan if isinstance(dan, str) and dan.endswith("단") else f"{dan}단"
+
+
+def today():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def iter_csv_rows(path):
+    # 깨진 줄은 건너뛰고 (이름, 단, 기록, 날짜) 튜플을 한 줄씩 (파일 전체를 메모리에 올리지 않음)
+    if not os.path.exists(path):
+        return
+    with open(path, mode='r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) < 4: continue # 데이터 깨짐 방지
+            try:
+                yield (row[0], row[1], float(row[2]), row[3])
+            except ValueError:
+                continue
+
+
+def read_csv_rows(path):
+    return list(iter_csv_rows(path))
+
+
+@contextmanager
+def file_lock(path):
+    # 같은 파일을 쓰는 다른 프로세스(서버 여러 개)와의 advisory 잠금
+    with open(path + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_rows(path, rows, fsync=True):
+    # 임시 파일에 다 쓴 뒤 rename 하므로, 읽는 쪽은 항상 이전 파일이나 새 파일 전체만 봄
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, mode='w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows)
+        f.flush()
+        if fsync:
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def prefix_upper(prefix):
+    # 이름이 prefix 로 시작하는지를 범위 조건(prefix <= 이름 < upper)으로 바꾸기 위한 상한
+    return prefix + "\U0010ffff"
+
+
+def row_matches(row, label, date_from, date_to, name_prefix):
+    name, row_label, _, date_str = row
+    return ((label is None or row_label == label)
+            and (date_from is None or date_str >= date_from)
+            and (date_to is None or date_str <= date_to)
+            and (not name_prefix or name.startswith(name_prefix)))
+
+
+def page_rows(rows, label=None, after=None, limit=20, date_from=None, date_to=None, name_prefix=None):
+    # 인덱스 없는 백엔드용 keyset 페이지: (기록, 이름, 단) 순으로 정렬한 뒤 after 다음부터 limit 개
+    # 커서 모양만 SQLite 와 같을 뿐, 몇 번째 페이지든 전체 행을 거르고 정렬함 (O(N log N))
+    rows = [r for r in rows if row_matches(r, label, date_from, date_to, name_prefix)]
+    rows.sort(key=lambda r: (r[2], r[0], r[1]))
+    if after is not None:
+        after = tuple(after)
+        rows = [r for r in rows if (r[2], r[0], r[1]) > after]
+    return rows[:limit]
+
+
+class RankStoreError(Exception):
+    # 저장소가 요청을 받고도 처리하지 못함 (예: 랭킹 서버의 "err" 응답)
+    # 연결/파일 오류(OSError)와 달리 다시 보내도 같으므로 RankWriter 는 재시도하지 않음
+    pass
+
+
+class RankStore:
+    # 랭킹 저장소 인터페이스. 새 백엔드는 save_many / rows / version 만 구현하면 됨
+    #   save_many(records): (이름, 단, 기록, 날짜) 목록 저장. (이름, 단) 마다 더 빠른 기록만 반영하므로
+    #                       같은 목록을 두 번 저장해도 결과가 같아야 함 (저널 재실행, 네트워크 재시도가 이걸 믿음)
+    #   rows()            : 전체 (이름, "7단", 기록, 날짜) 목록
+    #   version()         : 누가 저장하면 바뀌는 값 (Leaderboard / RankIndex 가 리런마다 부르므로 싸야 함)
+    #   top() / page()    : 기본 구현은 rows() 를 전부 읽어 거르고 정렬함. 인덱스가 있는 백엔드(SQLite)는 덮어씀
+    # fsync 속성은 RankWriter 가 fsync 정책에 맞게 바꿈
+    fsync = True
+
+    def save(self, name, dan, record_time):
+        self.save_many([(name, dan, record_time, today())])
+
+    def save_many(self, records):
+        raise NotImplementedError
+
+    def rows(self):
+        raise NotImplementedError
+
+    def version(self):
+        raise NotImplementedError
+
+    def top(self, label=None, limit=5):
+        rows = [r for r in self.rows() if label is None or r[1] == label]
+        rows.sort(key=lambda r: r[2])
+        return rows[:limit]
+
+    def page(self, label=None, after=None, limit=20, date_from=None, date_to=None, name_prefix=None):
+        return page_rows(self.rows(), label, after, limit, date_from, date_to, name_prefix)
+
+    def close(self):
+        pass
+
+
+class CsvRankStore(RankStore):
+    def __init__(self, path, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        rank_dir = os.path.dirname(path)
+        if rank_dir and not os.path.exists(rank_dir): os.makedirs(rank_dir)
+        if not os.path.exists(path):
+            with open(path, mode='w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerow(HEADER)
+
+    # [수정됨] 기록 저장 로직: 기존 기록 확인 후 갱신
+    def save_many(self, records):
+        # records: (이름, 단, 기록, 날짜) 목록. 파일은 잠근 채로 한 번만 읽고 한 번만 씀
+        best = {}
+        for name, dan, record_time, date_str in records:
+            key = (name, dan_label(dan))
+            if key not in best or record_time < best[key][0]:
+                best[key] = (record_time, date_str)
+
+        with self._lock, file_lock(self.path):
+            rows = [HEADER]
+
+            # 기존 파일 읽기
+            if os.path.exists(self.path):
+                with open(self.path, mode='r', encoding='utf-8') as f:
+                    reader = csv.reader(f)
+                    next(reader, None)
+                    for row in reader:
+                        # row = [이름, 단, 기록, 날짜]
+                        if len(row) < 4: continue # 데이터 깨짐 방지
+                        try:
+                            saved_time = float(row[2])
+                        except ValueError:
+                            continue
+
+                        # 같은 이름, 같은 단인 경우
+                        new = best.pop((row[0], row[1]), None)
+                        if new is not None and new[0] < saved_time: # 신기록이면 갱신
+                            row[2] = f"{new[0]:.2f}"
+                            row[3] = new[1]
+                        # 기존 기록이 더 좋으면 유지
+                        rows.append(row)
+
+            # 새로운 도전(리스트에 없던 경우)이라면 추가
+            for (name, label), (record_time, date_str) in best.items():
+                rows.append([name, label, f"{record_time:.2f}", date_str])
+
+            # 파일에 다시 쓰기
+            atomic_write_rows(self.path, rows, self.fsync)
+
+    def rows(self):
+        return read_csv_rows(self.path)
+
+    def version(self):
+        # 다른 프로세스가 파일을 바꿨는지 알아보는 값 (rename 으로 바뀌므로 mtime/크기가 달라짐)
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    # top / page 는 RankStore 기본 구현: CSV 는 인덱스가 없어서 전체를 읽고 거름 (큰 기록에는 sqlite 백엔드 권장)
+
+
+FSYNC_POLICIES = ["always", "batch", "none"]
+RETRY_MIN_SEC = 0.1  # 저장 실패 후 첫 재시도까지 (실패할 때마다 두 배)
+RETRY_MAX_SEC = 5.0
+RETRY_LIMIT = 10     # 한 묶음을 저장해 보는 최대 횟수 (약 25초)
+TRANSIENT_ERRORS = (OSError, sqlite3.OperationalError)  # 다시 해 보면 될 수 있는 오류 (ConnectionError, TimeoutError 포함)
+JOURNAL_ROTATE_BYTES = 256 * 1024  # 저널이 이보다 커지면 아직 저장 안 된 기록만 남기고 다시 씀
+
+
+class RankWriter:
+    # 프로세스 안의 모든 기록 저장을 전용 스레드 하나가 맡음 (단일 writer, write-behind)
+    # submit() 은 기록을 저널 파일에 한 줄 덧붙이고 큐에 넣은 뒤 바로 돌아옴
+    # writer 스레드는 batch_size 개가 모이거나 batch_ms 가 지나면 한 번에 save_many (group commit)
+    #
+    # fsync 정책
+    #   "always": submit 마다 저널을 fsync (전원이 나가도 기록 유지, 끝난 판마다 디스크 대기)
+    #   "batch" : 저널은 OS 버퍼까지만, 저장소는 묶음마다 fsync (프로세스가 죽어도 유지)
+    #   "none"  : 어디서도 fsync 하지 않음
+    # 저장은 (이름, 단) 최소값 규칙이라 같은 기록을 두 번 저장해도 결과가 같으므로, 저널 재실행은 안전함
+    # 이전에 죽은 프로세스의 저널은 내 저널로 옮긴 뒤 보통 기록처럼 큐에 넣음 (저장/재시도/리스너 모두 writer 스레드에서)
+    # -> 저장소가 꺼져 있어도 생성자는 실패하지 않음. 리스너는 재실행 기록도 받도록 listeners 로 미리 넘김
+    def __init__(self, store, journal_dir=None, batch_size=64, batch_ms=50, fsync_policy="batch", listeners=()):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"알 수 없는 fsync 정책: {fsync_policy}")
+        self.store = store
+        self.batch_size = batch_size
+        self.batch_ms = batch_ms
+        self.fsync_policy = fsync_policy
+        self.store.fsync = fsync_policy != "none"
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Condition(self._lock)
+        self._journal = None
+        self._journal_path = None
+        # 통계
+        self.flushed = 0
+        self.batches = 0
+        self.last_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        self.total_latency_ms = 0.0  # submit 부터 저장 완료까지 (기록마다 합산)
+        self.last_error = None
+        self._listeners = list(listeners)
+        self.retries = 0
+        self.failed = 0       # 저장을 포기한 기록 수 (저널에 남아 다음 시작 때 재실행)
+        self._unsaved = {}    # future -> 기록: 아직 저장되지 않은 기록 (큐/저장 중/포기). 저널에 남겨야 하는 것들
+        self._journal_base = 0  # 마지막으로 저널을 다시 쓴 직후 크기
+
+        replayed = []
+        if journal_dir is not None:
+            self._journal_path = os.path.join(journal_dir, f"pending-{os.getpid()}.jsonl")
+            replayed = self._take_journals(journal_dir)
+
+        self._thread = threading.Thread(target=self._run, name="rank-writer", daemon=True)
+        self._thread.start()
+        for record in replayed:
+            self._put(record)
+        atexit.register(self.flush, 5.0)  # 서버 종료 때 밀린 기록 저장 (못 하면 저널에 남음)
+
+    def _take_journals(self, journal_dir):
+        # 이전에 죽은 프로세스가 남긴 저널(같은 pid 이름 포함)의 기록을 모아 내 저널에 옮겨 쓰고 옛 파일을 지움
+        # 저장소에는 손대지 않음 (파일을 옮기는 동안 기록은 늘 어느 한 저널에는 남아 있음)
+        records, taken = [], []
+        try:
+            for path in glob.glob(os.path.join(journal_dir, "pending-*.jsonl")):
+                f = open(path, "a+", encoding='utf-8')
+                if fcntl is not None:
+                    try:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except OSError:
+                        f.close()
+                        continue  # 다른 프로세스가 아직 쓰는 중
+                taken.append((path, f))
+                f.seek(0)
+                for line in f:
+                    try:
+                        records.append(tuple(json.loads(line)))
+                    except ValueError:
+                        continue  # 쓰다 만 마지막 줄
+            self._rewrite_journal(records)
+            for path, _ in taken:
+                if path != self._journal_path:
+                    os.remove(path)
+        finally:
+            for _, f in taken:
+                f.close()
+        return records
+
+    def _rewrite_journal(self, records):
+        # 저널을 records 만 담은 새 파일로 바꿈: 임시 파일에 쓰고 잠근 뒤 rename
+        # (임시 파일 이름은 pending-*.jsonl 에 걸리지 않으므로 다른 프로세스가 재실행하지 않음)
+        tmp_path = f"{self._journal_path}.tmp"
+        journal = open(tmp_path, "w", encoding='utf-8')
+        if fcntl is not None:
+            # 살아 있는 writer 의 저널은 다른 프로세스가 재실행/삭제하지 못하게 잠가 둠
+            fcntl.flock(journal.fileno(), fcntl.LOCK_EX)
+        journal.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        journal.flush()
+        if self.fsync_policy != "none":
+            os.fsync(journal.fileno())
+        self._journal_base = journal.tell()
+        if self._journal is not None:
+            self._journal.close()  # Windows 는 열린 파일 위로 rename 할 수 없음
+        os.replace(tmp_path, self._journal_path)
+        self._journal = journal
+
+    def submit(self, name, dan, record_time):
+        record = (name, dan, record_time, today())
+        future = Future()
+        with self._lock:
+            if self._journal is not None:
+                self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self._journal.flush()
+                if self.fsync_policy == "always":
+                    os.fsync(self._journal.fileno())
+            # 저널 쓰기와 같은 잠금 안에서 등록해야 저널을 다시 쓸 때 빠지지 않음
+            self._pending += 1
+            self._unsaved[future] = record
+        self._queue.put((record, future, time.monotonic()))
+        return future
+
+    def _put(self, record):
+        # 이미 저널에 있는 기록(재실행)을 큐에 넣음
+        future = Future()
+        with self._lock:
+            self._pending += 1
+            self._unsaved[future] = record
+        self._queue.put((record, future, time.monotonic()))
+        return future
+
+    def add_listener(self, callback):
+        # 묶음 저장이 끝날 때마다 callback(records, before, after) 호출 (캐시/인덱스를 바로 갱신하는 용도)
+        # before / after: 이 묶음을 저장하기 직전 / 직후의 store.version()
+        # 캐시가 before 를 보고 있었을 때만 묶음을 반영하고 after 로 올리면, 다른 프로세스의 저장을 건너뛰지 않음
+        self._listeners.append(callback)
+
+    def queue_depth(self):
+        return self._pending
+
+    def stats(self):
+        return {
+            "queue_depth": self._pending,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "last_flush_ms": self.last_flush_ms,
+            "avg_flush_ms": self.total_flush_ms / self.batches if self.batches else 0.0,
+            "total_latency_ms": self.total_latency_ms,
+            "avg_latency_ms": self.total_latency_ms / self.flushed if self.flushed else 0.0,
+            "last_error": self.last_error,
+            "retries": self.retries,
+            "failed": self.failed,
+        }
+
+    def flush(self, timeout=None):
+        # 큐가 빌 때까지 기다림 (종료 직전이나 테스트용)
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.batch_ms / 1000
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            records = [record for record, _, _ in batch]
+            started = time.perf_counter()
+            before, after, error = self._save(records)
+            if error is None:
+                self._committed(batch, before, after, started)
+            elif len(batch) > 1 and not isinstance(error, TRANSIENT_ERRORS):
+                # 기록 하나 때문에 묶음 전체가 실패했을 수 있으므로 하나씩 나눠서 저장
+                for item in batch:
+                    started = time.perf_counter()
+                    before, after, error = self._save([item[0]])
+                    if error is None:
+                        self._committed([item], before, after, started)
+                    else:
+                        self._give_up([item], error)
+            else:
+                self._give_up(batch, error)
+
+    def _save(self, records):
+        # (before, after, 오류). 일시적인 오류(디스크/네트워크, sqlite 잠김)만 간격을 늘려 가며 RETRY_LIMIT 번까지 다시 시도
+        # 그동안 새 기록은 큐에 쌓임. 다른 오류(스키마, 잘못된 값)는 다시 해도 같으므로 바로 돌려줌
+        delay = RETRY_MIN_SEC
+        for attempt in range(RETRY_LIMIT):
+            try:
+                before = self.store.version()
+                self.store.save_many(records)
+                return before, self.store.version(), None
+            except TRANSIENT_ERRORS as e:
+                error = e
+                self.last_error = repr(e)
+                if attempt + 1 < RETRY_LIMIT:
+                    self.retries += 1
+                    time.sleep(delay)
+                    delay = min(delay * 2, RETRY_MAX_SEC)
+            except Exception as e:
+                self.last_error = repr(e)
+                return None, None, e
+        return None, None, error
+
+    def _committed(self, batch, before, after, started):
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        for callback in self._listeners:
+            try:
+                callback([record for record, _, _ in batch], before, after)
+            except Exception as e:
+                self.last_error = repr(e)
+        self.last_flush_ms = elapsed_ms
+        self.total_flush_ms += elapsed_ms
+        committed = time.monotonic()
+        self.total_latency_ms += sum(committed - submitted for _, _, submitted in batch) * 1000
+        self.batches += 1
+        self.flushed += len(batch)
+        with self._idle:
+            self._pending -= len(batch)
+            for _, future, _ in batch:
+                del self._unsaved[future]
+            if self._journal is not None:
+                self._trim_journal()
+            self._idle.notify_all()
+        for _, future, _ in batch: future.set_result(None)
+
+    def _trim_journal(self):
+        # 저장이 끝난 기록을 저널에서 덜어냄 (잠금 안에서 호출)
+        # 남길 게 없으면 비우고, 계속 밀려 있어도(큐가 비는 때가 없어도) 커지면 남길 기록만으로 다시 씀
+        # 다시 쓴 직후 크기의 두 배가 넘을 때만 다시 쓰므로 쓰는 양은 저장하는 양에 비례함
+        if not self._unsaved:
+            self._journal.truncate(0)
+            self._journal.seek(0)
+            self._journal_base = 0
+        elif self._journal.tell() > max(JOURNAL_ROTATE_BYTES, 2 * self._journal_base):
+            self._rewrite_journal(list(self._unsaved.values()))
+
+    def _give_up(self, batch, error):
+        # 저장하지 못한 기록: 호출한 쪽에는 예외로 알리고, _unsaved 에 남겨 저널에 두었다가 다음 시작 때 다시 시도
+        self.failed += len(batch)
+        with self._idle:
+            self._pending -= len(batch)
+            self._idle.notify_all()
+        for _, future, _ in batch: future.set_exception(error)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ranking (
+    name TEXT NOT NULL,
+    dan  TEXT NOT NULL,
+    time REAL NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ranking_name_dan ON ranking (name, dan);
+DROP INDEX IF EXISTS ranking_dan_time;
+DROP INDEX IF EXISTS ranking_time;
+CREATE INDEX IF NOT EXISTS ranking_dan_time_name ON ranking (dan, time, name);
+CREATE INDEX IF NOT EXISTS ranking_time_name ON ranking (time, name, dan);
+"""
+
+# 더 빠른 기록일 때만 시간/날짜를 바꿈
+UPSERT = """
+INSERT INTO ranking (name, dan, time, date) VALUES (?, ?, ?, ?)
+ON CONFLICT (name, dan) DO UPDATE SET time = excluded.time, date = excluded.date
+WHERE excluded.time < ranking.time
+"""
+
+
+class SqliteRankStore(RankStore):
+    def __init__(self, path, import_from=None, fsync=True):
+        self.path = path
+        self.fsync = fsync
+        self._local = threading.local()  # sqlite 연결은 스레드마다 따로 (streamlit 은 세션마다 스레드가 다름)
+        rank_dir = os.path.dirname(path)
+        if rank_dir and not os.path.exists(rank_dir): os.makedirs(rank_dir)
+        is_new = not os.path.exists(path)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        # 처음 만드는 DB 라면 기존 CSV 기록을 한 번 가져옴
+        if is_new and import_from and os.path.exists(import_from):
+            self.import_csv(import_from)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL 은 체크포인트 때만 fsync, OFF 는 fsync 안 함
+            conn.execute("PRAGMA synchronous=NORMAL" if self.fsync else "PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def save(self, name, dan, record_time):
+        self._conn().execute(UPSERT, (name, dan_label(dan), round(record_time, 2), today()))
+
+    def save_many(self, records):
+        # records: (이름, 단, 기록, 날짜) 목록. 한 트랜잭션으로 처리
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(UPSERT, ((n, dan_label(d), round(t, 2), day) for n, d, t, day in records))
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def rows(self):
+        return self._conn().execute("SELECT name, dan, time, date FROM ranking").fetchall()
+
+    def version(self):
+        # WAL 모드에서는 커밋이 -wal 파일에 먼저 쌓이므로 둘 다 봄
+        result = []
+        for path in (self.path, self.path + "-wal"):
+            try:
+                st = os.stat(path)
+                result.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                result.append(None)
+        return tuple(result)
+
+    def top(self, label=None, limit=5):
+        if label is None:
+            sql, args = "SELECT name, dan, time, date FROM ranking ORDER BY time LIMIT ?", (limit,)
+        else:
+            sql, args = "SELECT name, dan, time, date FROM ranking WHERE dan = ? ORDER BY time LIMIT ?", (label, limit)
+        return self._conn().execute(sql, args).fetchall()
+
+    def page(self, label=None, after=None, limit=20, date_from=None, date_to=None, name_prefix=None):
+        # keyset 페이지: after = 이전 페이지 마지막 행의 (기록, 이름, 단)
+        # OFFSET 을 쓰지 않으므로 몇 번째 페이지든 인덱스에서 limit 개만 읽음
+        where, args = [], []
+        if label is not None:
+            where.append("dan = ?"); args.append(label)
+        if date_from is not None:
+            where.append("date >= ?"); args.append(date_from)
+        if date_to is not None:
+            where.append("date <= ?"); args.append(date_to)
+        if name_prefix:
+            where.append("name >= ? AND name < ?"); args += [name_prefix, prefix_upper(name_prefix)]
+        if after is not None:
+            where.append("(time, name, dan) > (?, ?, ?)"); args += list(after)
+        sql = "SELECT name, dan, time, date FROM ranking"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY time, name, dan LIMIT ?"
+        args.append(limit)
+        return self._conn().execute(sql, args).fetchall()
+
+    def import_csv(self, csv_path):
+        rows = read_csv_rows(csv_path)
+        self.save_many(rows)
+        return len(rows)
+
+
+def open_store(backend, rank_dir, fsync=True, address=None):
+    # address: "kv" 백엔드의 랭킹 서버 주소 "host:port" (없으면 RANK_KV_ADDR 환경 변수)
+    # "segments" 백엔드는 RANK_PARTITION ("day"/"week"), RANK_RETENTION_DAYS (비어 있으면 안 지움) 환경 변수를 봄
+    csv_path = os.path.join(rank_dir, "ranking_speed.csv")
+    if backend == "sqlite":
+        return SqliteRankStore(os.path.join(rank_dir, "ranking.db"), import_from=csv_path, fsync=fsync)
+    if backend == "csv":
+        return CsvRankStore(csv_path, fsync=fsync)
+    if backend == "kv":
+        import rank_kv  # rank_kv 가 이 모듈을 import 하므로 여기서
+        return rank_kv.KvRankStore(address or os.environ.get("RANK_KV_ADDR", rank_kv.DEFAULT_ADDR), fsync=fsync)
+    if backend == "segments":
+        import rank_segments
+        retention = os.environ.get("RANK_RETENTION_DAYS")
+        return rank_segments.SegmentedRankStore(os.path.join(rank_dir, "segments"),
+                                                partition=os.environ.get("RANK_PARTITION", "day"),
+                                                retention_days=int(retention) if retention else None,
+                                                import_from=csv_path, fsync=fsync)
+    raise ValueError(f"알 수 없는 랭킹 저장소: {backend}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "import":
+        count = SqliteRankStore(sys.argv[3]).import_csv(sys.argv[2])
+        print(f"{count}개 기록을 {sys.argv[3]} 로 가져왔습니다.")
+    else:
+        print("사용법: python rank_store.py import <ranking.csv> <ranking.db>")
+        sys.exit(1)
@@ -0,0 +1,36 @@
+# 럭키덕키 서버 진입점: app.py 를 st.App (ASGI) 으로 감싸서 정적 이미지에 캐시 헤더를 붙임
+# streamlit 1.65 는 Starlette 로 /app/static/ 을 서빙하는데 Cache-Control 을 보내지 않음
+# (브라우저가 리런/새로고침마다 이미지를 다시 확인함)
+# publish_static_image 의 URL 은 파일 이름에 내용 해시가 들어가고 ?v=해시 가 붙으므로,
+# 그런 요청에만 1년 immutable 캐시를 붙임 (내용이 바뀌면 URL 이 바뀜)
+#
+#   $ streamlit run serve.py          (또는 uvicorn serve:app --port 8501)
+import streamlit as st
+from starlette.middleware import Middleware
+
+STATIC_PREFIX = "/app/static/"
+IMMUTABLE = b"public, max-age=31536000, immutable"
+
+
+class ImmutableStaticCache:
+    # 순수 ASGI 미들웨어: 응답 본문은 건드리지 않고 시작 헤더만 고침
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(STATIC_PREFIX) \
+                or b"v=" not in scope.get("query_string", b""):
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(k, v) for k, v in message.get("headers", []) if k.lower() != b"cache-control"]
+                headers.append((b"cache-control", IMMUTABLE))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache)
+
+
+app = st.App("app.py", middleware=[Middleware(ImmutableStaticCache)])
@@ -0,0 +1,163 @@
+# 럭키덕키 판별 원시 기록 (telemetry)
+# 최종 기록 말고도 한 판 동안의 클릭을 모두 남김: 몇 ms 에 어느 칸을 눌렀고, 정답/함정/빈 땅 중 무엇이었는지
+#
+# 한 판 = 고정 길이 바이너리 레코드 하나 (struct 로 포장, 텍스트 파싱 없음)
+#   머리   : 시작 시각(ms), 걸린 시간(ms), 페널티(ms), 클릭 수, 단, 모드      24 바이트
+#   클릭 x64: 시작 후 ms, 칸 번호, 결과, 그때 문제의 곱하는 수                 8 바이트씩
+# 레코드는 telemetry/rounds-v1-000001.bin 같은 세그먼트 파일 끝에 덧붙이기만 하고,
+# 세그먼트가 SEGMENT_BYTES 를 넘으면 다음 번호로 넘어감
+#
+# 읽을 때는 세그먼트를 numpy.memmap 으로 열어 구조화 배열로 바로 씀 (수백만 판도 복사 없이)
+# numpy 는 읽는 쪽에서만 필요하고, 앱(쓰는 쪽)은 struct 만 씀
+#
+#   $ python telemetry.py report [telemetry 폴더]   # 단 x 곱하는 수 별 평균 풀이 시간 / 실수율
+import glob
+import os
+import struct
+import sys
+import threading
+import time
+
+from game_core import CORRECT  # 클릭 결과 코드 (정답)
+
+FORMAT_VERSION = 1
+MAX_CLICKS = 64  # 이보다 많이 누른 판은 앞 64 번만 남김 (n_clicks 에는 실제 횟수)
+SEGMENT_BYTES = 32 * 1024 * 1024
+
+MODE_CLASSIC = 0
+MODE_FAST = 1
+
+HEADER = struct.Struct("<QIIHBB4x")
+CLICK = struct.Struct("<IBBBx")
+RECORD_SIZE = HEADER.size + CLICK.size * MAX_CLICKS
+EMPTY_CLICK = CLICK.pack(0, 0, 0, 0)
+
+
+def record_dtype():
+    # struct 레이아웃과 바이트 단위로 똑같은 numpy dtype (패딩 포함)
+    import numpy as np
+    click = np.dtype([("offset_ms", "<u4"), ("cell", "u1"), ("outcome", "u1"),
+                      ("multiplier", "u1"), ("_pad", "V1")])
+    dtype = np.dtype([
+        ("started_ms", "<u8"), ("total_ms", "<u4"), ("penalty_ms", "<u4"),
+        ("n_clicks", "<u2"), ("dan", "u1"), ("mode", "u1"), ("_pad", "V4"),
+        ("clicks", click, (MAX_CLICKS,)),
+    ])
+    assert dtype.itemsize == RECORD_SIZE
+    return dtype
+
+
+def pack_round(started_ms, total_ms, penalty_ms, dan, mode, clicks):
+    # clicks: [(시작 후 ms, 칸 번호, 결과, 곱하는 수), ...]
+    kept = clicks[:MAX_CLICKS]
+    body = b"".join(CLICK.pack(min(int(ms), 0xFFFFFFFF), cell, outcome, multiplier)
+                    for ms, cell, outcome, multiplier in kept)
+    return (HEADER.pack(int(started_ms), min(int(total_ms), 0xFFFFFFFF), min(int(penalty_ms), 0xFFFFFFFF),
+                        min(len(clicks), 0xFFFF), dan, mode)
+            + body + EMPTY_CLICK * (MAX_CLICKS - len(kept)))
+
+
+def segment_paths(log_dir):
+    return sorted(glob.glob(os.path.join(log_dir, f"rounds-v{FORMAT_VERSION}-*.bin")))
+
+
+class TelemetryLog:
+    # 쓰는 쪽. 레코드 하나를 O_APPEND 로 write 한 번에 씀 -> 여러 프로세스가 같은 세그먼트에 써도 섞이지 않음
+    # fsync 는 하지 않음 (분석용이라 서버가 죽을 때 마지막 몇 판이 빠지는 건 괜찮음)
+    def __init__(self, log_dir, segment_bytes=SEGMENT_BYTES):
+        self.log_dir = log_dir
+        self.segment_bytes = segment_bytes
+        self._lock = threading.Lock()
+        self._fd = None
+        self._path = None
+        os.makedirs(log_dir, exist_ok=True)
+
+    def _segment_fd(self):
+        if self._fd is not None and os.fstat(self._fd).st_size < self.segment_bytes:
+            return self._fd
+        paths = segment_paths(self.log_dir)
+        seq = int(paths[-1].rsplit("-", 1)[1].split(".")[0]) if paths else 1
+        # 다른 프로세스가 이미 다음 세그먼트로 넘어갔을 수도 있으니 항상 가장 최근 번호부터 봄
+        if paths and os.path.getsize(paths[-1]) >= self.segment_bytes:
+            seq += 1
+        path = os.path.join(self.log_dir, f"rounds-v{FORMAT_VERSION}-{seq:06d}.bin")
+        if path != self._path:
+            if self._fd is not None:
+                os.close(self._fd)
+            self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            self._path = path
+        return self._fd
+
+    def append(self, started_ms, total_ms, penalty_ms, dan, mode, clicks):
+        record = pack_round(started_ms, total_ms, penalty_ms, dan, mode, clicks)
+        with self._lock:
+            os.write(self._segment_fd(), record)
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+                self._path = None
+
+
+def open_segments(log_dir):
+    # 읽는 쪽: 세그먼트마다 읽기 전용 memmap 구조화 배열 하나 (쓰는 중인 마지막 레코드 조각은 잘라냄)
+    import numpy as np
+    dtype = record_dtype()
+    arrays = []
+    for path in segment_paths(log_dir):
+        count = os.path.getsize(path) // RECORD_SIZE
+        if count:
+            arrays.append(np.memmap(path, dtype=dtype, mode="r", shape=(count,)))
+    return arrays
+
+
+def fact_times(segments):
+    # 단 x 곱하는 수 별 (정답 수, 평균 풀이 ms, 오답 클릭 수)
+    # 풀이 시간 = 정답 클릭 시각 - 바로 앞 정답 클릭 시각 (첫 문제는 시작부터)
+    import numpy as np
+    solved = np.zeros((256, 256), dtype=np.int64)
+    solve_ms = np.zeros((256, 256), dtype=np.float64)
+    misses = np.zeros((256, 256), dtype=np.int64)
+    for rounds in segments:
+        clicks = rounds["clicks"]
+        offsets = clicks["offset_ms"].astype(np.int64)
+        valid = np.arange(MAX_CLICKS) < np.minimum(rounds["n_clicks"], MAX_CLICKS)[:, None]
+        correct = valid & (clicks["outcome"] == CORRECT)
+        last_correct = np.maximum.accumulate(np.where(correct, offsets, 0), axis=1)
+        previous = np.concatenate([np.zeros((len(rounds), 1), dtype=np.int64), last_correct[:, :-1]], axis=1)
+        dan = np.broadcast_to(rounds["dan"][:, None], offsets.shape)
+        multiplier = clicks["multiplier"]
+        np.add.at(solved, (dan[correct], multiplier[correct]), 1)
+        np.add.at(solve_ms, (dan[correct], multiplier[correct]), (offsets - previous)[correct])
+        wrong = valid & ~correct
+        np.add.at(misses, (dan[wrong], multiplier[wrong]), 1)
+    rows = []
+    for dan, multiplier in zip(*np.nonzero(solved)):
+        n = solved[dan, multiplier]
+        rows.append((int(dan), int(multiplier), int(n), solve_ms[dan, multiplier] / n, int(misses[dan, multiplier])))
+    return rows
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def main(argv):
+    if len(argv) < 2 or argv[1] != "report":
+        print("사용법: python telemetry.py report [telemetry 폴더]")
+        return 2
+    log_dir = argv[2] if len(argv) > 2 else "telemetry"
+    segments = open_segments(log_dir)
+    total = sum(len(s) for s in segments)
+    print(f"세그먼트 {len(segments)}개, {total}판")
+    rows = sorted(fact_times(segments), key=lambda r: -r[3])
+    print(f"{'문제':>8} {'풀이 수':>8} {'평균 ms':>9} {'오답':>6}")
+    for dan, multiplier, n, mean_ms, miss in rows[:20]:
+        print(f"{f'{dan} x {multiplier}':>8} {n:>8} {mean_ms:>9.0f} {miss:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -3,12 +3,17 @@ import random
 import time
 import base64
 import os
+import game_core
+import problem_pool
 
 # --- 1. 설정 및 이미지 로드 ---
 st.set_page_config(page_title="럭키덕키 구구단", page_icon="🐹", layout="centered")
 
 # 이미지 경로 (images 폴더 확인 필수)
 IMG_DIR = "images"
+# 구구단 범위 (app.py 와 같은 설정: "2-19", "1-9" 처럼)
+DANS = game_core.parse_range(os.environ.get("DAN_RANGE", "2-9"))
+MULTIPLIERS = game_core.parse_range(os.environ.get("MULTIPLIER_RANGE", "1-9"))
 MOLE_IMG_PATH = os.path.join(IMG_DIR, "mole.png")  # 두더지
 HOLE_IMG_PATH = os.path.join(IMG_DIR, "hole.jpg")  # 구덩이
 
@@ -70,35 +75,22 @@ def init_game():
     if 'game_state' not in st.session_state: st.session_state.game_state = None
     if 'difficulty_limit' not in st.session_state: st.session_state.difficulty_limit = 9999.0
 
+# [수정] 문제판은 미리 만들어 둔 것에서 꺼냄 (프로세스당 하나, 두더지 총 3마리: 정답 1 + 함정 2)
+@st.cache_resource
+def get_problem_pool():
+    # 기본 범위에 드는 조합만 미리 채움 (나머지는 처음 나올 때)
+    return problem_pool.GridPool([dan for dan in DANS if dan in game_core.DANS],
+                                 [m for m in MULTIPLIERS if m in game_core.MULTIPLIERS], traps=2)
+
+# [수정] 문제 만들기/채점은 game_core 를 같이 씀
 def generate_new_problem(dan):
-    multiplier = random.randint(1, 9)
-    answer = dan * multiplier
-    
-    # 1. 9개의 숫자 생성 (정답 1개 + 오답 8개)
-    grid_numbers = [answer]
-    while len(grid_numbers) < 9:
-        wrong = random.randint(1, 81)
-        if wrong != answer and wrong not in grid_numbers:
-            grid_numbers.append(wrong)
-    random.shuffle(grid_numbers)
-    
-    # 2. 정답 위치 찾기
-    answer_idx = grid_numbers.index(answer)
-    
-    # 3. 두더지 위치 선정 (총 3마리: 정답 1 + 오답 2)
-    all_indices = list(range(9))
-    all_indices.remove(answer_idx)
-    distraction_moles = random.sample(all_indices, 2)
-    mole_indices = set([answer_idx] + distraction_moles)
-    
-    return {
-        'problem': f"{dan} x {multiplier}",
-        'answer': answer,
-        'grid': grid_numbers,
-        'mole_indices': mole_indices,
-        'answer_idx': answer_idx,
-        'start_time': time.time()
-    }
+    problem = get_problem_pool().draw(dan, random.choice(MULTIPLIERS))
+    return dict(
+        problem,
+        mole_indices={problem['correct_mole_idx'], *problem['trap_indices']},
+        answer_idx=problem['correct_mole_idx'],
+        start_time=time.time(),
+    )
 
 def check_answer(idx):
     current = st.session_state.game_state
@@ -111,15 +103,16 @@ def check_answer(idx):
         return
 
     selected_num = current['grid'][idx]
+    outcome = game_core.judge(current, idx)
     
     # 1. 정답 칸 (점수 +)
-    if idx == current['answer_idx']:
+    if outcome == game_core.CORRECT:
         st.session_state.score += 10
         st.toast("정답! 잡았다 요놈! 🔨 (+10점)", icon="🐹")
         st.session_state.game_state = generate_new_problem(st.session_state.dan)
         
     # 2. 오답인데 두더지 (감점 -)
-    elif idx in current['mole_indices']:
+    elif outcome == game_core.TRAP:
         st.session_state.fails += 1
         st.session_state.score = max(0, st.session_state.score - 5)
         st.toast(f"으악! {selected_num}은(는) 함정이에요!", icon="💥")
@@ -142,7 +135,7 @@ if not images_ready:
 # 상단 설정 바
 col1, col2, col3 = st.columns([1, 2, 2])
 with col1:
-    st.session_state.dan = st.selectbox("몇 단?", range(2, 10))
+    st.session_state.dan = st.selectbox("몇 단?", DANS)
 with col2:
     diff = st.radio("난이도", ["쉬움", "보통(5초)", "어려움(3초)"], label_visibility="collapsed")
     limit = 9999.0
@@ -0,0 +1,126 @@
+# 게임 엔진 벤치마크 (Streamlit 없이 game_core 만)
+# 봇 N 명이 번갈아 가며 한 번씩 클릭해서 한 판씩 끝까지 진행 (시계는 가짜라 실제로 기다리지 않음)
+#   - 초당 몇 판을 처리하는지
+#   - 한 판에 메모리를 얼마나 쓰는지 (tracemalloc: 한 판 동안의 최대 사용량, 끝난 뒤 남는 블록 수)
+#   - 끝난 판의 기록을 RankWriter 로 저장할 때 초당 몇 건인지
+#
+# --pool 이면 문제판을 problem_pool 에서 꺼냄 (앱과 같은 방식)
+# 단 / 곱하는 수 범위는 앱과 같이 DAN_RANGE / MULTIPLIER_RANGE (또는 --dans / --multipliers)
+#
+#   $ python tools/bench_core.py --bots 200 --rounds 50 --backend sqlite
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import game_core  # noqa: E402
+import problem_pool  # noqa: E402
+import rank_store  # noqa: E402
+
+THINK_MS = (300, 1500)  # 봇이 한 번 누르는 데 걸리는 (가짜) 시간
+
+
+def bot_click(state, rng, miss_rate):
+    # 대부분은 정답, miss_rate 확률로 아무 칸이나 누름
+    if rng.random() < miss_rate:
+        return rng.randrange(9)
+    return state.problem['correct_mole_idx']
+
+
+def play(bots, rounds, miss_rate, seed, pool=None, dans=game_core.DANS, multipliers=game_core.MULTIPLIERS):
+    # 봇마다 상태 하나씩 들고 돌아가며 클릭. 끝난 판은 (이름, 단, 기록) 으로 모음
+    rng = random.Random(seed)
+    now = 0.0
+    records = []
+    remaining = [rounds] * bots
+    states = [game_core.start_round(rng.choice(dans), now, rng, pool, multipliers) for _ in range(bots)]
+    active = list(range(bots))
+    while active:
+        still_active = []
+        for b in active:
+            now += rng.randint(*THINK_MS) / 1000 / bots
+            state, _ = game_core.click(states[b], bot_click(states[b], rng, miss_rate), now, rng, pool)
+            if state.finished_at is not None:
+                records.append((f"bot{b}", state.dan, game_core.record(state)))
+                remaining[b] -= 1
+                if remaining[b] == 0:
+                    continue
+                state = game_core.start_round(rng.choice(dans), now, rng, pool, multipliers)
+            states[b] = state
+            still_active.append(b)
+        active = still_active
+    return records
+
+
+def measure_memory(rounds, miss_rate, seed):
+    # 봇 한 명으로 한 판씩: 판마다 최대 사용량을 재고, 전체가 끝난 뒤 남은 블록 수를 판 수로 나눔
+    rng = random.Random(seed)
+    tracemalloc.start()
+    baseline_blocks = sys.getallocatedblocks()
+    total_peak = 0
+    for _ in range(rounds):
+        tracemalloc.reset_peak()
+        start_size, _ = tracemalloc.get_traced_memory()
+        state = game_core.start_round(7, 0.0, rng)
+        now = 0.0
+        while state.finished_at is None:
+            now += 0.5
+            state, _ = game_core.click(state, bot_click(state, rng, miss_rate), now, rng)
+        _, peak = tracemalloc.get_traced_memory()
+        total_peak += peak - start_size  # 목록에 모으면 그 자체가 남는 블록이 되므로 합계만
+        del state
+    retained = sys.getallocatedblocks() - baseline_blocks
+    tracemalloc.stop()
+    return total_peak / rounds, retained / rounds
+
+
+def measure_writes(backend, records):
+    rank_dir = tempfile.mkdtemp(prefix="bench-core-")
+    store = rank_store.open_store(backend, rank_dir)
+    writer = rank_store.RankWriter(store, journal_dir=rank_dir)
+    started = time.perf_counter()
+    futures = [writer.submit(name, dan, record_time) for name, dan, record_time in records]
+    for f in futures:
+        f.result()
+    return time.perf_counter() - started, writer.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20, help="봇 한 명이 하는 판 수")
+    parser.add_argument("--miss-rate", type=float, default=0.15)
+    parser.add_argument("--backend", default="csv", choices=["csv", "sqlite"])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--pool", action="store_true", help="문제판을 미리 만들어 둔 풀에서 꺼냄")
+    parser.add_argument("--dans", default=os.environ.get("DAN_RANGE", "2-9"), help="단 범위 (예: 2-19)")
+    parser.add_argument("--multipliers", default=os.environ.get("MULTIPLIER_RANGE", "1-9"), help="곱하는 수 범위")
+    args = parser.parse_args()
+    dans = game_core.parse_range(args.dans)
+    multipliers = game_core.parse_range(args.multipliers)
+
+    pool = problem_pool.GridPool(dans, multipliers) if args.pool else None
+    if pool is not None:
+        pool.fill()
+    started = time.perf_counter()
+    records = play(args.bots, args.rounds, args.miss_rate, args.seed, pool, dans, multipliers)
+    elapsed = time.perf_counter() - started
+    if pool is not None:
+        print(f"문제판 풀: {pool.stats()}")
+    print(f"봇 {args.bots}명 x {args.rounds}판 = {len(records)}판, {elapsed:.2f}초 "
+          f"-> {len(records) / elapsed:,.0f}판/초 ({elapsed / len(records) * 1e6:.1f} us/판)")
+
+    peak, retained = measure_memory(min(len(records), 2000), args.miss_rate, args.seed)
+    print(f"메모리: 한 판 최대 {peak / 1024:.1f} KB, 끝난 뒤 남는 블록 {retained:.2f}개/판")
+
+    write_elapsed, stats = measure_writes(args.backend, records)
+    print(f"기록 저장({args.backend}): {len(records)}건 {write_elapsed:.2f}초 -> {len(records) / write_elapsed:,.0f}건/초 "
+          f"(묶음 {stats['batches']}번, 평균 {stats['avg_flush_ms']:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
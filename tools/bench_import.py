@@ -0,0 +1,104 @@
+# 앱 시작 import 비용 측정 (python -X importtime)
+# app.py 맨 위의 import 문을 그대로 새 프로세스에서 실행해, 모듈별 누적 시간과 불러온 모듈 목록을 잼
+# tools/import_baseline.json 과 비교해서 느려졌거나 무거운 모듈(pandas 등)이 시작 경로에 들어오면 실패
+# 모듈 수가 기준값보다 늘어도 실패 (시작 import 를 바꾼 커밋에서 --update 로 기준값도 같이 갱신)
+#
+#   $ python tools/bench_import.py            # 기준값과 비교
+#   $ python tools/bench_import.py --update   # 기준값 갱신
+import ast
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+APP_FILE = os.path.join(ROOT, "app.py")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "import_baseline.json")
+RUNS = 5
+TIME_TOLERANCE = 1.5  # 기준보다 50% 넘게 느려지면 실패 (기계마다 편차가 있어서 넉넉하게)
+FORBIDDEN = ["pandas", "numpy", "PIL", "pyarrow"]  # 시작 경로에 있으면 안 되는 무거운 모듈
+
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def startup_imports():
+    # app.py 의 모듈 최상위 import 문만 골라냄 (함수 안의 지연 import 는 제외)
+    with open(APP_FILE, encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    lines = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.unparse(node))
+    return lines
+
+
+def measure_once(code):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    top_level = {}
+    modules = set()
+    for line in result.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        cumulative, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        modules.add(name)
+        if indent == 1:  # 가장 바깥 import 만 합계에 넣음 (안쪽은 이미 누적에 포함)
+            top_level[name] = top_level.get(name, 0) + cumulative
+    return top_level, modules
+
+
+def measure():
+    code = "\n".join(startup_imports())
+    # 인터프리터가 원래 시작할 때 불러오는 모듈(site, encodings ...)은 빼고 셈
+    _, interpreter_modules = measure_once("pass")
+    runs = [measure_once(code) for _ in range(RUNS)]
+    runs = [({n: t for n, t in top.items() if n not in interpreter_modules}, mods - interpreter_modules)
+            for top, mods in runs]
+    names = set().union(*(r[0].keys() for r in runs))
+    per_module = {n: statistics.median(r[0].get(n, 0) for r in runs) / 1000 for n in names}
+    modules = runs[0][1]
+    return {
+        "total_ms": round(sum(per_module.values()), 1),
+        "module_count": len(modules),
+        "top_modules_ms": {n: round(ms, 1) for n, ms in sorted(per_module.items(), key=lambda x: -x[1])[:10]},
+        "forbidden_loaded": sorted(m for m in FORBIDDEN if m in modules),
+    }
+
+
+def main():
+    current = measure()
+    print(f"시작 import 합계 {current['total_ms']:.1f} ms, 모듈 {current['module_count']}개")
+    for name, ms in current["top_modules_ms"].items():
+        print(f"  {name:<30} {ms:8.1f} ms")
+
+    if "--update" in sys.argv:
+        with open(BASELINE_FILE, "w", encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"기준값 저장: {BASELINE_FILE}")
+        return 0
+
+    failed = False
+    if current["forbidden_loaded"]:
+        print(f"실패: 시작 경로에서 무거운 모듈을 불러옴 {current['forbidden_loaded']}")
+        failed = True
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, encoding='utf-8') as f:
+            baseline = json.load(f)
+        limit = baseline["total_ms"] * TIME_TOLERANCE
+        print(f"기준값 {baseline['total_ms']:.1f} ms (허용 {limit:.1f} ms), 모듈 {baseline['module_count']}개")
+        if current["total_ms"] > limit:
+            print("실패: import 시간이 기준보다 많이 늘었음")
+            failed = True
+        if current["module_count"] > baseline["module_count"]:
+            print(f"실패: 시작 경로 모듈이 {current['module_count'] - baseline['module_count']}개 늘었음 "
+                  "(의도한 것이면 --update 로 기준값 갱신)")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# 미리 만들어 둔 문제판(problem_pool)이 고르게 섞여 있는지 카이제곱 검정으로 확인
+# 한 (단, 곱하는 수) 에서 판을 많이 꺼내서
+#   - 정답 칸 위치       : 9칸에 고르게
+#   - (정답 칸, 함정 칸) : 가능한 짝 72개에 고르게 (함정 1마리일 때)
+#   - 오답 숫자          : 오답 후보(game_core.distractor_candidates)에 구간 잡는 방식대로 (가장자리 숫자는 덜 나옴)
+#   - 정답 순위          : 9개 숫자를 정렬했을 때 정답의 자리가 9자리에 고르게 (가운데 값 = 정답이면 안 됨)
+#   - 가장 빽빽한 값     : ±2 안에 다른 숫자가 가장 많은 값이 정답인 비율이 1/9 (같으면 나눠 셈)
+# 를 보고, p 값이 --alpha 보다 작으면 실패 (scipy 없이 불완전 감마 함수로 p 값 계산)
+# 정답이 아주 작아 구간이 1 에서 잘리는 문제(2 x 1 등)는 정답 순위가 고를 수 없으므로 검사 대상이 아님
+# 판을 꺼내는 시간도 make_problem 을 바로 부를 때와 비교해서 보여줌
+#
+#   $ python tools/check_grid_uniformity.py --dan 7 --multiplier 8 --draws 200000
+import argparse
+import collections
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import game_core  # noqa: E402
+import problem_pool  # noqa: E402
+
+
+def chi2_sf(x, df):
+    # P(X >= x), X ~ 카이제곱(df) = 정규화된 위쪽 불완전 감마 함수 Q(df/2, x/2)
+    a, x = df / 2, x / 2
+    if x <= 0:
+        return 1.0
+    log_prefix = -x + a * math.log(x) - math.lgamma(a)
+    if x < a + 1:
+        # 급수 전개로 P 를 구하고 1 - P
+        term = total = 1.0 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+    # 연분수 (modified Lentz)
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = 1 / (d if abs(d) > tiny else tiny)
+        c = b + an / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return h * math.exp(log_prefix)
+
+
+def chi2_test(counts, expected):
+    # counts, expected: 같은 칸 순서의 목록 -> (카이제곱, 자유도, p 값)
+    stat = sum((c - e) ** 2 / e for c, e in zip(counts, expected))
+    df = len(counts) - 1
+    return stat, df, chi2_sf(stat, df)
+
+
+def expected_values(dan, multiplier, n):
+    # make_problem 과 같은 방식: 구간 시작 low 가 고르게, 그 구간의 오답 size - 1 개 중 DISTRACTORS 개
+    answer = dan * multiplier
+    size = game_core.window_size(dan)
+    lows = range(max(1, answer - size + 1), answer + 1)
+    share = n * game_core.DISTRACTORS / (size - 1) / len(lows)
+    expected = collections.Counter()
+    for low in lows:
+        for v in range(low, low + size):
+            if v != answer:
+                expected[v] += share
+    return expected
+
+
+def densest_share(grid, answer):
+    # ±2 안에 다른 숫자가 가장 많은 값들 중 정답의 몫 (정답이 아니면 0)
+    counts = {v: sum(1 for w in grid if w != v and abs(w - v) <= 2) for v in grid}
+    best = max(counts.values())
+    top = [v for v in grid if counts[v] == best]
+    return 1 / len(top) if answer in top else 0.0
+
+
+def draw_all(pool, dan, multiplier, draws):
+    # 채우기 스레드 없이 비면 직접 채움 -> 모든 판이 미리 만든 판
+    problems = []
+    for _ in range(draws):
+        if not pool._pools[(dan, multiplier)]:
+            pool.fill()
+        problems.append(pool.draw(dan, multiplier))
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dan", type=int, default=7)
+    parser.add_argument("--multiplier", type=int, default=8)
+    parser.add_argument("--draws", type=int, default=100000)
+    parser.add_argument("--alpha", type=float, default=0.001)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    pool = problem_pool.GridPool(dans=[args.dan], multipliers=[args.multiplier], size=1024, background=False)
+    if args.seed is not None:
+        pool._rng.seed(args.seed)
+    problems = draw_all(pool, args.dan, args.multiplier, args.draws)
+    n = len(problems)
+    answer = args.dan * args.multiplier
+    wrong_values = game_core.distractor_candidates(args.dan, args.multiplier)
+    expected = expected_values(args.dan, args.multiplier, n)
+
+    answer_cells = collections.Counter(p['correct_mole_idx'] for p in problems)
+    pairs = collections.Counter((p['correct_mole_idx'], p['trap_indices'][0]) for p in problems)
+    values = collections.Counter(v for p in problems for v in p['grid'] if v != answer)
+    ranks = collections.Counter(sorted(p['grid']).index(answer) for p in problems)
+    densest = sum(densest_share(p['grid'], answer) for p in problems)
+    all_pairs = [(a, t) for a in range(9) for t in range(9) if a != t]
+
+    tests = [
+        ("정답 칸", chi2_test([answer_cells[i] for i in range(9)], [n / 9] * 9)),
+        ("정답/함정 칸", chi2_test([pairs[k] for k in all_pairs], [n / len(all_pairs)] * len(all_pairs))),
+        # 한 판 안에서는 중복 없이 뽑으므로 칸 사이가 약간 음의 상관 -> 검정이 조금 보수적임
+        ("오답 숫자", chi2_test([values[v] for v in wrong_values], [expected[v] for v in wrong_values])),
+        ("정답 순위", chi2_test([ranks[i] for i in range(9)], [n / 9] * 9)),
+        ("가장 빽빽한 값", chi2_test([densest, n - densest], [n / 9, n * 8 / 9])),
+    ]
+    print(f"{args.dan} x {args.multiplier}: 판 {n:,}개 (정답이 가운데 {ranks[4] / n:.1%}, "
+          f"가장 빽빽한 값 {densest / n:.1%}, 우연이면 {1 / 9:.1%})")
+    ok = True
+    for name, (stat, df, p) in tests:
+        passed = p >= args.alpha
+        ok = ok and passed
+        print(f"  {name:<10} 카이제곱 {stat:9.1f}  자유도 {df:3d}  p = {p:.4f}  {'OK' if passed else '실패'}")
+
+    # 꺼내는 시간: 큐에서 꺼내기 vs 그 자리에서 만들기
+    rounds = 20000
+    pool = problem_pool.GridPool(dans=[args.dan], multipliers=[args.multiplier], size=rounds, background=False)
+    pool.fill()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        pool.draw(args.dan, args.multiplier)
+    pooled_us = (time.perf_counter() - started) / rounds * 1e6
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        game_core.make_problem(args.dan, args.multiplier, rng)
+    inline_us = (time.perf_counter() - started) / rounds * 1e6
+    print(f"  꺼내기 {pooled_us:.2f} us/판, make_problem {inline_us:.2f} us/판")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
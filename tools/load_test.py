@@ -0,0 +1,249 @@
+# 동시 접속 부하 테스트
+# app.py 를 실제 streamlit 서버로 (serve.py 진입점) 띄우고, 브라우저 대신 웹소켓 클라이언트 여러 개가
+# 처음 화면 -> 도전 준비 -> 게임(정답만 클릭) -> 클리어 -> 처음 화면 을 think time 을 두고 반복
+#
+# 리런마다 (BackMsg 를 보낸 뒤 script_finished 까지 걸린 시간, 받은 바이트) 를 모으고,
+# 동시 세션 수를 단계별로 늘려가며 p50/p95/p99 지연, 리런당 바이트, 서버 RSS 를 표로 보여줌
+# 브라우저처럼 캐시 가능한 메시지의 해시를 서버에 알려주므로, 두 번째부터는 참조(ref_hash)만 받음
+#
+# 기록/telemetry 는 임시 폴더에 쓰므로 실제 랭킹에는 봇 기록이 남지 않음
+#
+#   $ python tools/load_test.py --levels 1,10,50 --rounds 2 --think 0.3,1.0
+import argparse
+import asyncio
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FINISHED_EARLY_FOR_RERUN = ForwardMsg.ScriptFinishedStatus.Value("FINISHED_EARLY_FOR_RERUN")
+QUESTION_RE = re.compile(r"question-box'>(\d+) x (\d+) = \?")
+NUMBER_RE = re.compile(r"number-label'>(\d+)<")
+MAX_CLICKS_PER_ROUND = 50
+
+
+def start_server(port, data_dir):
+    env = dict(os.environ, RANK_DIR=os.path.join(data_dir, "rank"), TELEMETRY_DIR=os.path.join(data_dir, "telemetry"))
+    os.makedirs(env["RANK_DIR"], exist_ok=True)
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "serve.py", "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=open(os.path.join(data_dir, "server.log"), "w"),
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/_stcore/health", timeout=1) as r:
+                if r.status == 200:
+                    return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit 서버가 뜨지 않음")
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def percentile(values, p):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+class Session:
+    # 브라우저 탭 하나 역할: 위젯 값은 계속 들고 있다가 리런마다 같이 보내고, 버튼은 그 리런에만 trigger
+    def __init__(self, url, stats):
+        self.url = url
+        self.stats = stats
+        self.ws = None
+        self.values = {}     # 위젯 id -> WidgetState (값 위젯)
+        self.cache = {}      # 메시지 해시 -> ForwardMsg (브라우저 메시지 캐시)
+        self.elements = []   # 마지막 리런에서 받은 요소 (종류, id, 라벨, 본문, fragment id)
+
+    async def connect(self):
+        origin = self.url.replace("ws://", "http://").split("/_stcore")[0]
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"], origin=origin, max_size=None)
+
+    async def close(self):
+        await self.ws.close()
+
+    async def rerun(self, trigger=None, fragment_id=""):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = ""
+        state.fragment_id = fragment_id
+        state.cached_message_hashes.extend(self.cache)
+        for widget in self.values.values():
+            state.widget_states.widgets.add().CopyFrom(widget)
+        if trigger is not None:
+            state.widget_states.widgets.add(id=trigger, trigger_value=True)
+
+        started = time.perf_counter()
+        received = 0
+        elements = []
+        await self.ws.send(msg.SerializeToString())
+        while True:
+            data = await self.ws.recv()
+            received += len(data)
+            fwd = ForwardMsg()
+            fwd.ParseFromString(data)
+            if fwd.WhichOneof("type") == "ref_hash":
+                fwd = self.cache[fwd.ref_hash]
+            elif fwd.metadata.cacheable and fwd.hash:
+                self.cache[fwd.hash] = fwd
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                element_type = element.WhichOneof("type")
+                body = getattr(element, element_type)
+                elements.append((element_type, getattr(body, "id", ""), getattr(body, "label", ""),
+                                 getattr(body, "body", ""), fwd.delta.fragment_id))
+            elif kind == "script_finished" and fwd.script_finished != FINISHED_EARLY_FOR_RERUN:
+                break
+        self.stats.append(("fragment" if fragment_id else "full", time.perf_counter() - started, received))
+        self.elements = elements
+
+    def find(self, element_type, label=None, id_suffix=None):
+        for e in self.elements:
+            if e[0] == element_type and (label is None or label in e[2]) and (id_suffix is None or e[1].endswith(id_suffix)):
+                return e
+        raise LookupError(f"{element_type} {label or id_suffix} 없음")
+
+    def has_text(self, text):
+        return any(text in e[3] for e in self.elements if e[0] == "markdown")
+
+    async def click(self, label=None, id_suffix=None):
+        button = self.find("button", label, id_suffix)
+        await self.rerun(trigger=button[1], fragment_id=button[4])
+
+    def set_text(self, label, value):
+        widget = self.find("text_input", label)
+        self.values[widget[1]] = WidgetState(id=widget[1], string_value=value)
+
+    def correct_cell(self):
+        bodies = [e[3] for e in self.elements if e[0] == "markdown"]
+        question = next(m for m in map(QUESTION_RE.search, bodies) if m)
+        grid = [int(m.group(1)) for m in map(NUMBER_RE.search, bodies) if m]
+        return grid.index(int(question.group(1)) * int(question.group(2)))
+
+
+async def play(url, name, rounds, think, stats, errors):
+    session = Session(url, stats)
+
+    async def pause():
+        await asyncio.sleep(random.uniform(*think))
+
+    try:
+        await session.connect()
+        await session.rerun()
+        for _ in range(rounds):
+            await pause()
+            await session.click("도전 시작")
+            await pause()
+            session.set_text("도전자 이름", name)
+            await session.click("게임 스타트")
+            for _ in range(MAX_CLICKS_PER_ROUND):
+                if session.has_text("축하합니다"):
+                    break
+                await pause()
+                await session.click(id_suffix=f"-mole_{session.correct_cell()}")
+            await pause()
+            await session.click("홈으로 이동")
+    except Exception as e:
+        errors.append(f"{name}: {e!r}")
+    finally:
+        if session.ws is not None:
+            await session.close()
+
+
+async def run_level(url, pid, sessions, rounds, think):
+    stats, errors, rss = [], [], []
+    stop = asyncio.Event()
+
+    async def sample_rss():
+        while not stop.is_set():
+            if pid:
+                value = rss_mb(pid)
+                if value is not None:
+                    rss.append(value)
+            await asyncio.sleep(0.25)
+
+    sampler = asyncio.create_task(sample_rss())
+    started = time.perf_counter()
+    await asyncio.gather(*(play(url, f"bot{sessions}-{i}", rounds, think, stats, errors) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await sampler
+    return stats, errors, rss, elapsed
+
+
+def report(sessions, stats, errors, rss, elapsed):
+    latencies = [s[1] * 1000 for s in stats]
+    size = [s[2] for s in stats]
+    fragment = [s[1] * 1000 for s in stats if s[0] == "fragment"]
+    print(f"{sessions:>5} {len(stats):>6} {len(stats) / elapsed:>7.1f} "
+          f"{percentile(latencies, 50):>7.1f} {percentile(latencies, 95):>7.1f} {percentile(latencies, 99):>7.1f} "
+          f"{percentile(fragment, 50):>8.1f} {sum(size) / max(len(size), 1) / 1024:>8.1f} "
+          f"{max(rss) if rss else float('nan'):>8.1f} {len(errors):>5}")
+    for e in errors[:3]:
+        print(f"      오류 {e}")
+
+
+async def main_async(args):
+    think = tuple(float(x) for x in args.think.split(","))
+    levels = [int(x) for x in args.levels.split(",")]
+    proc = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        data_dir = tempfile.mkdtemp(prefix="load-test-")
+        proc = start_server(args.port, data_dir)
+        url, pid = f"ws://localhost:{args.port}/_stcore/stream", proc.pid
+        print(f"서버 pid {pid}, 데이터 {data_dir}")
+    try:
+        # 처음 한 판은 import/캐시 준비 시간이 섞이므로 버림
+        await run_level(url, pid, 1, 1, (0.0, 0.0))
+        print(f"{'세션':>5} {'리런':>6} {'리런/초':>7} {'p50ms':>7} {'p95ms':>7} {'p99ms':>7} "
+              f"{'frag50':>8} {'KB/리런':>8} {'RSS MB':>8} {'오류':>5}")
+        for sessions in levels:
+            report(sessions, *await run_level(url, pid, sessions, args.rounds, think))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", default="1,5,10,25", help="동시 세션 수 (쉼표로 구분, 차례대로 실행)")
+    parser.add_argument("--rounds", type=int, default=1, help="세션 하나가 하는 판 수")
+    parser.add_argument("--think", default="0.2,0.8", help="클릭 사이 대기 시간 범위(초) 최소,최대")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--url", help="이미 떠 있는 서버에 붙을 때 (예: ws://host:8501/_stcore/stream)")
+    parser.add_argument("--pid", type=int, help="--url 을 쓸 때 RSS 를 잴 서버 pid")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
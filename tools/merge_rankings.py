@@ -0,0 +1,204 @@
+# 여러 컴퓨터(교실 노트북)에서 따로 쌓인 랭킹 합치기
+# 입력: ranking_speed.csv, ranking.db (sqlite 백엔드), 랭킹 서버 로그(.jsonl), segments/ 의 CSV,
+#       또는 그 파일들이 들어 있는 rank 폴더
+# (이름, 단) 마다 가장 빠른 기록과 그 날짜만 남김 (같은 기록이면 먼저 세운 날짜)
+#
+# 메모리에는 --chunk 줄까지만 올림 (외부 정렬)
+#   1) 입력을 한 줄씩 읽어 chunk 만큼 모이면 (이름, 단) 으로 줄이고 정렬해서 임시 run 파일로 씀
+#   2) run 파일들을 heapq.merge 로 합치면서 같은 (이름, 단) 중 첫 줄만 남김
+#      행을 (이름, 단, 기록, 날짜) 튜플 순서 그대로 정렬하므로, 같은 (이름, 단) 에서는 가장 좋은 기록이 맨 앞에 옴
+#      (run 이 --fan-in 개보다 많으면 여러 번에 나눠 합침)
+# 결과가 .db 면 sqlite 백엔드 파일, 아니면 앱이 그대로 읽는 CSV (RANK_DIR 의 ranking_speed.csv 자리에 두면 됨)
+#
+#   $ python tools/merge_rankings.py -o rank/ranking_speed.csv laptop1/rank laptop2/rank/ranking_speed.csv
+import argparse
+import csv
+import glob
+import heapq
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+try:
+    import resource  # 유닉스 전용. 윈도우에서는 최대 메모리를 출력하지 않음
+except ImportError:
+    resource = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rank_store  # noqa: E402
+
+RANK_FILES = ("ranking_speed.csv", "ranking.db", "kv.jsonl")
+
+
+def iter_sqlite_rows(path):
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        yield from conn.execute("SELECT name, dan, time, date FROM ranking")
+    finally:
+        conn.close()
+
+
+def iter_jsonl_rows(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                name, label, record_time, date_str = json.loads(line)
+            except ValueError:
+                continue
+            yield name, label, record_time, date_str
+
+
+def input_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            found = [os.path.join(path, name) for name in RANK_FILES if os.path.exists(os.path.join(path, name))]
+            found += sorted(glob.glob(os.path.join(path, "segments", "*.csv")))  # segments 백엔드 (요약 + 세그먼트)
+            if not found:
+                print(f"  경고: {path} 에 랭킹 파일이 없음")
+            yield from found
+        else:
+            yield path
+
+
+def iter_rows(path):
+    if path.endswith(".db"):
+        rows = iter_sqlite_rows(path)
+    elif path.endswith(".jsonl"):
+        rows = iter_jsonl_rows(path)
+    else:
+        rows = rank_store.iter_csv_rows(path)
+    for name, dan, record_time, date_str in rows:
+        yield name, rank_store.dan_label(dan), float(record_time), date_str
+
+
+def write_run(best, tmp_dir):
+    # 한 chunk 를 (이름, 단, 기록, 날짜) 순으로 정렬해 run 파일 하나로
+    fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+    with os.fdopen(fd, "w", newline='', encoding='utf-8') as f:
+        # csv 는 float 를 repr 로 쓰므로 읽을 때 같은 값으로 돌아옴
+        csv.writer(f).writerows(sorted((name, label, t, d) for (name, label), (t, d) in best.items()))
+    return path
+
+
+def read_run(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        for name, label, record_time, date_str in csv.reader(f):
+            yield name, label, float(record_time), date_str
+
+
+def make_runs(paths, chunk, tmp_dir):
+    runs, best, total = [], {}, 0
+    for path in paths:
+        for name, label, record_time, date_str in iter_rows(path):
+            total += 1
+            key = (name, label)
+            value = (record_time, date_str)  # 빠른 기록, 같으면 이른 날짜
+            saved = best.get(key)
+            if saved is None or value < saved:
+                best[key] = value
+            if len(best) >= chunk:
+                runs.append(write_run(best, tmp_dir))
+                best = {}
+    if best or not runs:
+        runs.append(write_run(best, tmp_dir))
+    return runs, total
+
+
+def merge_sorted(iterables):
+    # 정렬된 여러 스트림 -> (이름, 단) 마다 첫 줄(가장 좋은 기록) 하나, 역시 정렬된 순서
+    last_name = last_label = None
+    for row in heapq.merge(*iterables):
+        if row[1] != last_label or row[0] != last_name:
+            last_name, last_label = row[0], row[1]
+            yield row
+
+
+def merge_runs(runs, fan_in, tmp_dir):
+    # run 이 fan_in 개 이하가 될 때까지 fan_in 개씩 묶어 합친 run 을 새로 씀 (열린 파일 수 제한)
+    passes = 0
+    while len(runs) > fan_in:
+        passes += 1
+        merged_runs = []
+        for i in range(0, len(runs), fan_in):
+            group = runs[i:i + fan_in]
+            fd, path = tempfile.mkstemp(suffix=".run", dir=tmp_dir)
+            with os.fdopen(fd, "w", newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(merge_sorted([read_run(p) for p in group]))
+            for p in group:
+                os.remove(p)
+            merged_runs.append(path)
+        runs = merged_runs
+    return runs, passes
+
+
+def write_csv(path, rows):
+    # 임시 파일에 다 쓴 뒤 rename (rank_store.atomic_write_rows 와 같은 방식, 한 줄씩 스트리밍)
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory): os.makedirs(directory)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    count = 0
+    with open(tmp_path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(rank_store.HEADER)
+        for name, label, record_time, date_str in rows:
+            writer.writerow([name, label, f"{record_time:.2f}", date_str])
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return count
+
+
+def write_sqlite(path, rows, batch=10000):
+    # 이미 있는 DB 라면 그 기록과도 최소값으로 합쳐짐 (upsert)
+    store = rank_store.SqliteRankStore(path)
+    count = 0
+    while True:
+        chunk = list(itertools.islice(rows, batch))
+        if not chunk:
+            return count
+        store.save_many(chunk)
+        count += len(chunk)
+
+
+def peak_memory_text():
+    # ru_maxrss 단위: 리눅스는 KB, 맥은 바이트
+    if resource is None:
+        return ""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return f", 최대 메모리 {peak_mb:.0f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputs", nargs="+", help="랭킹 CSV / ranking.db / 서버 로그(.jsonl) / rank 폴더")
+    parser.add_argument("-o", "--output", required=True, help="결과 파일 (.db 면 sqlite, 아니면 CSV)")
+    parser.add_argument("--chunk", type=int, default=200000, help="메모리에 한 번에 올리는 (이름, 단) 수")
+    parser.add_argument("--fan-in", type=int, default=64, help="한 번에 합치는 run 파일 수")
+    parser.add_argument("--tmp-dir", help="run 파일을 둘 폴더 (기본: 시스템 임시 폴더)")
+    args = parser.parse_args()
+
+    paths = list(input_paths(args.inputs))
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="merge-rank-", dir=args.tmp_dir) as tmp_dir:
+        runs, total = make_runs(paths, args.chunk, tmp_dir)
+        run_count = len(runs)
+        runs, passes = merge_runs(runs, args.fan_in, tmp_dir)
+        rows = merge_sorted([read_run(p) for p in runs])
+        if args.output.endswith(".db"):
+            count = write_sqlite(args.output, rows)
+        else:
+            count = write_csv(args.output, rows)
+    elapsed = time.perf_counter() - started
+
+    print(f"입력 {len(paths)}개 파일, {total:,}줄 -> (이름, 단) {count:,}개 ({args.output})")
+    print(f"run {run_count}개, 중간 합치기 {passes}번, {elapsed:.2f}초{peak_memory_text()}")
+
+
+if __name__ == "__main__":
+    main()
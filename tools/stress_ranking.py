@@ -0,0 +1,83 @@
+# 랭킹 동시 저장 스트레스 테스트
+# 여러 프로세스(서버 여러 대 역할) x 여러 스레드(동시에 끝나는 세션 역할)가 한꺼번에 기록을 저장하고
+# 빠진 기록이 하나도 없는지, (이름, 단) 마다 최소 기록이 남았는지 확인
+# --backend kv 면 이 프로세스 안에 랭킹 서버(rank_kv)를 띄우고 모든 프로세스가 그 서버 하나에 저장
+#
+#   $ python tools/stress_ranking.py --backend csv --procs 4 --threads 100
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import rank_kv  # noqa: E402
+import rank_store  # noqa: E402
+
+
+def finisher_process(backend, rank_dir, proc_id, threads, barrier):
+    store = rank_store.open_store(backend, rank_dir)
+    writer = rank_store.RankWriter(store)
+    start = threading.Barrier(threads)
+    errors = []
+
+    def finish(thread_id):
+        start.wait()
+        try:
+            # 각자 다른 이름 하나 + 모두가 같이 쓰는 이름 하나
+            writer.submit(f"p{proc_id}-{thread_id}", 2 + thread_id % 8, 10.0 + thread_id).result()
+            writer.submit("shared", 7, 100.0 - (proc_id * threads + thread_id) / 100).result()
+        except Exception as e:
+            errors.append(repr(e))
+
+    barrier.wait()
+    workers = [threading.Thread(target=finish, args=(i,)) for i in range(threads)]
+    for w in workers: w.start()
+    for w in workers: w.join()
+    if errors:
+        print(f"프로세스 {proc_id} 오류: {errors[:3]}")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", default="csv", choices=["csv", "sqlite", "kv", "segments"])
+    parser.add_argument("--procs", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=100)
+    args = parser.parse_args()
+
+    rank_dir = tempfile.mkdtemp(prefix="rank-stress-")
+    if args.backend == "kv":
+        server = rank_kv.start_server(path=os.path.join(rank_dir, "kv.jsonl"))
+        os.environ["RANK_KV_ADDR"] = "%s:%d" % server.server_address  # 자식 프로세스도 같은 서버로
+    rank_store.open_store(args.backend, rank_dir)  # 파일/스키마 미리 생성
+    barrier = multiprocessing.Barrier(args.procs)
+    started = time.perf_counter()
+    procs = [multiprocessing.Process(target=finisher_process,
+                                     args=(args.backend, rank_dir, p, args.threads, barrier))
+             for p in range(args.procs)]
+    for p in procs: p.start()
+    for p in procs: p.join()
+    elapsed = time.perf_counter() - started
+
+    rows = rank_store.open_store(args.backend, rank_dir).rows()
+    names = {r[0] for r in rows}
+    expected = {f"p{p}-{t}" for p in range(args.procs) for t in range(args.threads)} | {"shared"}
+    lost = expected - names
+    shared = [r for r in rows if r[0] == "shared"]
+    best_shared = round(100.0 - (args.procs * args.threads - 1) / 100, 2)
+
+    total = args.procs * args.threads * 2
+    print(f"{args.backend}: {args.procs} 프로세스 x {args.threads} 스레드, 저장 {total}회, {elapsed:.2f}초")
+    print(f"  빠진 기록: {len(lost)}개, 중복 (이름, 단): {len(rows) - len({(r[0], r[1]) for r in rows})}개")
+    print(f"  shared 최소 기록: {shared[0][2] if shared else None} (기대값 {best_shared})")
+    ok = not lost and len(shared) == 1 and abs(shared[0][2] - best_shared) < 1e-6
+    ok = ok and all(p.exitcode == 0 for p in procs)
+    print("  OK" if ok else "  실패")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()